@@ -1,6 +1,17 @@
 import os
 from datetime import timedelta
 
+# Set by gunicorn.conf.py / the process manager; 1x1 for the dev server
+WORKERS = int(os.getenv("GUNICORN_WORKERS", os.getenv("WEB_CONCURRENCY", 1)))
+THREADS = int(os.getenv("GUNICORN_THREADS", 1))
+WORKER_CLASS = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+# Requests one worker serves at once: its threads, or its greenlets under gevent
+CONCURRENCY = (
+    int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 100))
+    if WORKER_CLASS == "gevent"
+    else THREADS
+)
+
 
 class Config:
     """Base configuration class."""
@@ -18,6 +29,161 @@ class Config:
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "Shhhhdonttell")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=7)
 
+    # Engine pool, per worker process. Each concurrent request needs a
+    # connection, plus one for the analytics flush thread. Pool and overflow
+    # are capped so all workers together stay within DB_MAX_CONNECTIONS;
+    # under gevent, greenlets past that wait for a connection cooperatively.
+    DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", 100))
+    DB_POOL_SIZE = int(
+        os.getenv(
+            "DB_POOL_SIZE", max(1, min(CONCURRENCY + 1, DB_MAX_CONNECTIONS // WORKERS))
+        )
+    )
+    DB_MAX_OVERFLOW = int(
+        os.getenv(
+            "DB_MAX_OVERFLOW",
+            max(0, min(DB_POOL_SIZE, DB_MAX_CONNECTIONS // WORKERS - DB_POOL_SIZE)),
+        )
+    )
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    # PostgreSQL only. The connect timeout bounds a connection attempt to an
+    # unreachable server, the statement timeout applies to web requests (not
+    # the CLI or migrations)
+    DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", 5))
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+    # File-backed SQLite (WAL and synchronous=NORMAL are always set)
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+    # Per-request Server-Timing header and timing log line
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED") == "1"
+
+    # Per-endpoint SQL statement budgets: "raise" (tests) or "log"
+    QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE")
+
+    # Slow query log (disabled unless SLOW_QUERY_MS is set)
+    SLOW_QUERY_MS = (
+        float(os.getenv("SLOW_QUERY_MS")) if os.getenv("SLOW_QUERY_MS") else None
+    )
+    SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 1.0))
+    SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "1") == "1"
+    # Logs real parameter values (user data) instead of their types, to debug only
+    SLOW_QUERY_LOG_PARAMS = os.getenv("SLOW_QUERY_LOG_PARAMS") == "1"
+
+    # Prometheus-style /metrics. Point METRICS_MULTIPROC_DIR at a directory
+    # shared by all gunicorn workers on the host to aggregate across them.
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED") == "1"
+    METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Analytics ingestion buffer
+    ANALYTICS_BUFFER_SIZE = int(os.getenv("ANALYTICS_BUFFER_SIZE", 200))
+    ANALYTICS_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_FLUSH_INTERVAL", 2.0))
+    ANALYTICS_BATCH_MAX_EVENTS = int(os.getenv("ANALYTICS_BATCH_MAX_EVENTS", 500))
+
+    # Analytics retention (archive defaults to <instance>/analytics-archive)
+    ANALYTICS_RETENTION_DAYS = int(os.getenv("ANALYTICS_RETENTION_DAYS", 90))
+    ANALYTICS_ARCHIVE_DIR = os.getenv("ANALYTICS_ARCHIVE_DIR")
+
+    # Admin overview reads planner estimates instead of counters (PostgreSQL only)
+    ADMIN_COUNTS_APPROXIMATE = os.getenv("ADMIN_COUNTS_APPROXIMATE") == "1"
+
+    # Lead capture dedupe filter (per app and worker, rebuilt larger when full)
+    LEADS_BLOOM_CAPACITY = int(os.getenv("LEADS_BLOOM_CAPACITY", 200000))
+    LEADS_BLOOM_ERROR_RATE = float(os.getenv("LEADS_BLOOM_ERROR_RATE", 0.0001))
+
+    # /health/deep probes are cached this long so frequent LB checks stay cheap
+    HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", 5))
+    HEALTH_WEATHER_TIMEOUT = float(os.getenv("HEALTH_WEATHER_TIMEOUT", 2))
+    HEALTH_DB_TIMEOUT = float(os.getenv("HEALTH_DB_TIMEOUT", 2))
+
+    # Read replicas: comma separated URIs. GET requests read from a healthy
+    # replica unless the user (by JWT identity, tracked in the cache) or an
+    # anonymous client (by cookie) wrote within READ_YOUR_WRITES_SECONDS.
+    SQLALCHEMY_REPLICA_URIS = [
+        u for u in os.getenv("DB_REPLICA_URIS", "").split(",") if u
+    ]
+    READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+    REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", 30))
+
+    # Cache: "memory" (per worker LRU) or "sqlite" (one WAL file shared by
+    # all workers on the host, default <instance>/cache.sqlite)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH")
+    CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", 300))
+    WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", 600))
+    # Also bounds how long other workers serve a baseline after a past record
+    # is edited, when the backend is per worker
+    BASELINE_CACHE_TTL = int(os.getenv("BASELINE_CACHE_TTL", 900))
+    # Same for a day's wake time, used by the ultradian schedule
+    SCHEDULE_CACHE_TTL = int(os.getenv("SCHEDULE_CACHE_TTL", 300))
+    # How long other callers wait on an in-flight recomputation of a key
+    CACHE_LOCK_TIMEOUT = float(os.getenv("CACHE_LOCK_TIMEOUT", 10))
+
+    # Keep-alive connections per outbound host (weather provider), per worker
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", max(10, CONCURRENCY)))
+
+    # Admission control, per worker (core/admission.py). Past
+    # ADMISSION_MAX_CONCURRENT requests wait in a queue of ADMISSION_MAX_QUEUE
+    # for up to ADMISSION_QUEUE_TIMEOUT seconds, then get a 503. /health and
+    # /metrics bypass the limit, but under gthread they still need a free
+    # thread to run on, so limit plus queue stays ADMISSION_FREE_THREADS below
+    # the worker's concurrency. Off when a worker serves one request at a
+    # time. With 4 threads: 2 running (1 kept for authenticated writes),
+    # 1 queued and 1 left for health checks.
+    ADMISSION_ENABLED = (
+        os.getenv("ADMISSION_ENABLED", "1" if CONCURRENCY > 1 else "0") == "1"
+    )
+    ADMISSION_FREE_THREADS = int(
+        os.getenv("ADMISSION_FREE_THREADS", max(1, CONCURRENCY // 8))
+    )
+    # Limit plus queue
+    ADMISSION_BUDGET = max(1, CONCURRENCY - ADMISSION_FREE_THREADS)
+    ADMISSION_MAX_QUEUE = int(
+        os.getenv(
+            "ADMISSION_MAX_QUEUE", ADMISSION_BUDGET // 4 or int(ADMISSION_BUDGET > 1)
+        )
+    )
+    ADMISSION_MAX_CONCURRENT = int(
+        os.getenv(
+            "ADMISSION_MAX_CONCURRENT", max(1, ADMISSION_BUDGET - ADMISSION_MAX_QUEUE)
+        )
+    )
+    # Slots only authenticated writes may use
+    ADMISSION_RESERVED_HIGH = int(
+        os.getenv(
+            "ADMISSION_RESERVED_HIGH",
+            (
+                max(1, ADMISSION_MAX_CONCURRENT // 8)
+                if ADMISSION_MAX_CONCURRENT > 1
+                else 0
+            ),
+        )
+    )
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 2))
+    ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 1))
+
+    # Response compression (gzip/deflate, brotli when installed)
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 6))
+
+    # Flask-Migrate is only set up under the `flask` CLI, set this to have
+    # it on the app everywhere (e.g. running migrations from a script)
+    MIGRATIONS_ALWAYS = os.getenv("MIGRATIONS_ALWAYS") == "1"
+
+    # Gunicorn worker warm-up (gunicorn.conf.py): prime baselines and today's
+    # wake time (the schedule) for the most recently active users, those with
+    # a record in the last WARMUP_DAYS.
+    # Workers start serving after WARMUP_TIMEOUT seconds (at most half the
+    # gunicorn timeout) whether or not warm-up has finished.
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+    WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", 10))
+    WARMUP_USERS = int(os.getenv("WARMUP_USERS", 50))
+    WARMUP_DAYS = int(os.getenv("WARMUP_DAYS", 1))
+
 
 class DevelopmentConfig(Config):
     """Development configuration class."""
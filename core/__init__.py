@@ -1,39 +1,41 @@
-from flask import Flask, request, jsonify, abort, render_template
+from flask import Flask, request, jsonify, abort, render_template, Response
 
 from werkzeug.security import check_password_hash
 
 from dotenv import load_dotenv
-import csv, pathlib
 import os
 
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 
-from .extensions import db, migrate, cors, jwt
+from .extensions import db, migrate, cors, jwt, analytics_buffer, metrics, cache
+from .engine import configure_engine, init_sqlite_pragmas, init_statement_timeout
 from .functions import generate_ultradian_cycles
+from .commands import analytics_cli, counters_cli, seed_cli
+from . import counters  # registers the row counter hooks
 from .models import User, UserDailyRecord, UserCycleEvent, Leads
-from .routes import (
-    auth as auth_bp,
-    records as records_bp,
-    cycles as cycles_bp,
-    users as user_bp,
-    ultradian as ultradian_bp,
-    vital as vital_bp,
-    vibe_bp,
-    analytics_bp,
-    admin_bp,
-)
-from core.routes.auth import oauth
+from .leads import capture_lead
+from .health import deep_health
+from .admission import init_admission
+from .json_provider import FastJSONProvider
+from .compression import init_compression
+from .replicas import configure_replica_binds, init_replicas
+from .profiling import init_profiling
+from .query_budget import init_query_budgets
+from .slow_queries import init_slow_query_log
 
 from datetime import date, datetime, timedelta
-import requests
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
 # if os.getenv("FLASK_ENV") == "development":
 load_dotenv()
 
 
 def create_app(config=None):
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
 
     # Load configuration
     if config is None:
@@ -43,11 +45,31 @@ def create_app(config=None):
 
     app.config.from_object(config)
 
-    print(app.config["RUNNING"])  # Print the running message from Config
+    logger.info(app.config["RUNNING"])
+    logger.info("Using DB: %s", _safe_uri(app.config.get("SQLALCHEMY_DATABASE_URI")))
+
+    # Blueprints are imported here rather than at module level, so importing
+    # core (models, CLI helpers, scripts) doesn't load every route module
+    from .routes import (
+        auth as auth_bp,
+        records as records_bp,
+        cycles as cycles_bp,
+        users as user_bp,
+        ultradian as ultradian_bp,
+        vital as vital_bp,
+        vibe_bp,
+        analytics_bp,
+        admin_bp,
+    )
+    from .routes.auth import init_oauth
+
     # Initialize extensions
-    print("Using DB:", app.config.get("SQLALCHEMY_DATABASE_URI"))
 
+    configure_engine(app)
+    configure_replica_binds(app)
     db.init_app(app)
+    init_sqlite_pragmas(app)
+    init_statement_timeout(app)
     migrate.init_app(app, db)
     cors.init_app(
         app,
@@ -67,7 +89,17 @@ def create_app(config=None):
         },
     )
     jwt.init_app(app)
-    oauth.init_app(app)
+    # First of the request hooks, see core/admission.py
+    init_admission(app)
+    init_oauth(app)
+    analytics_buffer.init_app(app)
+    init_profiling(app)
+    init_query_budgets(app)
+    init_slow_query_log(app)
+    metrics.init_app(app)
+    cache.init_app(app)
+    init_compression(app)
+    init_replicas(app)
 
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
@@ -77,14 +109,21 @@ def create_app(config=None):
     app.url_map.strict_slashes = False
 
     API_SECRET = os.getenv("API_SHARED_SECRET")
-    print("Google Client ID:", os.getenv("GOOGLE_CLIENT_ID"))
+    logger.info("Google OAuth configured: %s", bool(app.config.get("GOOGLE_CLIENT_ID")))
 
     @app.before_request
     def verify_origin():
         if request.method == "OPTIONS":
             return
         if request.path.startswith(
-            ("/admin", "/static", "/health", "/temp", "api/auth/login/google")
+            (
+                "/admin",
+                "/static",
+                "/health",
+                "/metrics",
+                "/temp",
+                "api/auth/login/google",
+            )
         ):
             return
 
@@ -158,6 +197,7 @@ def create_app(config=None):
         response.headers["Access-Control-Allow-Headers"] = (
             "Content-Type, Authorization, X-Ultra-Secret"
         )
+        response.headers["Access-Control-Expose-Headers"] = "X-Next-Cursor"
 
         return response
 
@@ -172,22 +212,41 @@ def create_app(config=None):
     app.register_blueprint(analytics_bp)
     app.register_blueprint(admin_bp)
 
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(seed_cli)
+
     @app.route("/health", methods=["GET"])
     def status():
         return jsonify({"status": "running"}), 200
 
-    CSV_PATH = pathlib.Path("leads.csv")
+    @app.route("/health/deep", methods=["GET"])
+    def deep_status():
+        result = deep_health()
+        return jsonify(result), 503 if result["status"] == "down" else 200
+
+    @app.route("/metrics", methods=["GET"])
+    def prometheus_metrics():
+        if not metrics.enabled:
+            abort(404)
+
+        token = app.config.get("METRICS_TOKEN")
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            abort(401)
+
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
     @app.route("/leads", methods=["POST"])
     def get_leads():
-        email = request.json.get("email", "").strip().lower()
-        name = request.json.get("name", "").strip().title()
-        ts = datetime.now().isoformat()
+        data = request.get_json(silent=True) or {}
+        email = (data.get("email") or "").strip().lower()
+        name = (data.get("name") or "").strip().title()
 
-        new_lead = Leads(email=email, name=name)
+        if not email:
+            return jsonify({"error": "Missing email"}), 400
 
-        db.session.add(new_lead)
-        db.session.commit()
+        # Repeat submissions get the same response, see core/leads.py
+        capture_lead(email, name)
 
         return (
             jsonify({"message": "Successfully added", "name": name, "email": email}),
@@ -213,3 +272,9 @@ def create_app(config=None):
         return render_template("temp-login.html")
 
     return app
+
+
+def _safe_uri(uri):
+    from sqlalchemy.engine import make_url
+
+    return make_url(uri).render_as_string(hide_password=True) if uri else None
@@ -0,0 +1,196 @@
+import threading
+import time
+from collections import Counter, deque
+
+from flask import g, jsonify, request
+
+# Lower is more important
+CRITICAL, HIGH, NORMAL = 0, 1, 2
+PRIORITY_NAMES = {CRITICAL: "critical", HIGH: "high", NORMAL: "normal"}
+
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class _Waiter:
+    def __init__(self, priority):
+        self.priority = priority
+        self.admitted = threading.Event()
+        self.displaced = False
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded, prioritised wait queue.
+
+    At most max_concurrent requests run at once, reserved_high of those slots
+    are kept for high priority requests. Up to max_queue more wait, high
+    priority first and then in arrival order; a high priority request that
+    finds the queue full takes the place of the newest normal one. Anything
+    else beyond that, or still waiting after queue_timeout, is shed.
+    Critical requests bypass the limit and don't take up its slots.
+    """
+
+    def __init__(self, max_concurrent, max_queue, queue_timeout, reserved_high=0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.reserved_high = min(max(0, reserved_high), self.max_concurrent - 1)
+        self.active = 0
+        self.critical = 0
+        self.shed = Counter()  # (priority name, reason) -> count
+        self._queues = {HIGH: deque(), NORMAL: deque()}
+        self._lock = threading.Lock()
+
+    def _limit(self, priority):
+        if priority == NORMAL:
+            return self.max_concurrent - self.reserved_high
+        return self.max_concurrent
+
+    def _queued(self):
+        return sum(len(q) for q in self._queues.values())
+
+    def acquire(self, priority):
+        """
+        Take a slot. Returns (admitted, reason, waited_seconds), reason is
+        "queue_full", "displaced" or "timeout" when the request is shed.
+        """
+        if priority == CRITICAL:
+            with self._lock:
+                self.critical += 1
+            return True, None, 0.0
+
+        with self._lock:
+            ahead = any(self._queues[p] for p in self._queues if p <= priority)
+            if not ahead and self.active < self._limit(priority):
+                self.active += 1
+                return True, None, 0.0
+            if self._queued() >= self.max_queue:
+                if priority == NORMAL or not self._queues[NORMAL]:
+                    self.shed[PRIORITY_NAMES[priority], "queue_full"] += 1
+                    return False, "queue_full", 0.0
+                bumped = self._queues[NORMAL].pop()
+                bumped.displaced = True
+                bumped.admitted.set()
+                self.shed[PRIORITY_NAMES[NORMAL], "displaced"] += 1
+            waiter = _Waiter(priority)
+            self._queues[priority].append(waiter)
+
+        started = time.monotonic()
+        admitted = waiter.admitted.wait(self.queue_timeout)
+        waited = time.monotonic() - started
+        if waiter.displaced:
+            return False, "displaced", waited
+        if not admitted:
+            with self._lock:
+                if waiter.admitted.is_set():
+                    admitted = True  # a slot was handed over as the wait ran out
+                else:
+                    self._queues[priority].remove(waiter)
+                    self.shed[PRIORITY_NAMES[priority], "timeout"] += 1
+        return admitted, None if admitted else "timeout", waited
+
+    def release(self, priority):
+        with self._lock:
+            if priority == CRITICAL:
+                self.critical -= 1
+                return
+            self.active -= 1
+            # Hand freed slots straight to waiters so nobody can barge past them
+            for priority in (HIGH, NORMAL):
+                queue = self._queues[priority]
+                while queue and self.active < self._limit(priority):
+                    self.active += 1
+                    queue.popleft().admitted.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": self.active,
+                "critical": self.critical,
+                "queued": self._queued(),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "shed": {
+                    f"{p}:{reason}": n for (p, reason), n in sorted(self.shed.items())
+                },
+            }
+
+
+def request_priority():
+    """
+    critical: health checks and metrics scrapes, so the load balancer and
+    monitoring still get answers from an overloaded worker.
+    high: writes carrying a valid access token.
+    normal: everything else, including unauthenticated CORS preflights.
+    """
+    if request.path == "/health" or request.path.startswith(("/health/", "/metrics")):
+        return CRITICAL
+    if request.method in WRITE_METHODS and _has_valid_token():
+        return HIGH
+    return NORMAL
+
+
+def _has_valid_token():
+    header = request.headers.get("Authorization", "")
+    if not header.startswith("Bearer "):
+        return False
+    from flask_jwt_extended import decode_token
+
+    # Signature and expiry only, the user lookup happens in the view
+    try:
+        decode_token(header[len("Bearer ") :])
+    except Exception:
+        return False
+    return True
+
+
+def init_admission(app):
+    """
+    Limit the requests this worker works on at once (ADMISSION_* settings).
+    Excess requests wait in a short queue, then get a 503 with Retry-After,
+    rather than piling up until the load balancer times them out.
+    """
+    if not app.config.get("ADMISSION_ENABLED", False):
+        return
+
+    from .extensions import metrics
+
+    controller = AdmissionController(
+        max_concurrent=app.config.get("ADMISSION_MAX_CONCURRENT", 8),
+        max_queue=app.config.get("ADMISSION_MAX_QUEUE", 8),
+        queue_timeout=app.config.get("ADMISSION_QUEUE_TIMEOUT", 2.0),
+        reserved_high=app.config.get("ADMISSION_RESERVED_HIGH", 1),
+    )
+    retry_after = str(app.config.get("ADMISSION_RETRY_AFTER", 1))
+    app.extensions["admission"] = controller
+
+    # create_app calls this before the other init_* helpers, so this hook
+    # runs before theirs and a shed request costs as little as possible
+    @app.before_request
+    def admit():
+        # Start the request timer here, so latency metrics include the time
+        # spent queued and shed responses are recorded too
+        request.environ.setdefault("metrics.start", time.perf_counter())
+        priority = request_priority()
+        admitted, reason, waited = controller.acquire(priority)
+        if waited:
+            metrics.observe(
+                "http_admission_wait_seconds", waited, priority=PRIORITY_NAMES[priority]
+            )
+        if not admitted:
+            metrics.inc(
+                "http_requests_shed_total",
+                priority=PRIORITY_NAMES[priority],
+                reason=reason,
+            )
+            response = jsonify({"error": "Server busy, please retry shortly"})
+            response.status_code = 503
+            response.headers["Retry-After"] = retry_after
+            return response
+        g._admitted = priority
+
+    @app.teardown_request
+    def release(_exc):
+        priority = g.pop("_admitted", None)
+        if priority is not None:
+            controller.release(priority)
@@ -0,0 +1,179 @@
+import atexit
+import logging
+import threading
+import time
+
+from sqlalchemy import exc, insert
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsBuffer:
+    """
+    In-process buffer for AnalyticsEvent rows.
+    Events are queued in memory and written with one multi-row insert when the
+    buffer reaches ANALYTICS_BUFFER_SIZE or every ANALYTICS_FLUSH_INTERVAL seconds,
+    whichever comes first. Anything still queued is flushed when the worker exits.
+    """
+
+    def __init__(self, app=None):
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._app = None
+
+        self.max_size = 200
+        self.interval = 2.0
+        self.max_pending = 10000
+        self.enabled = True
+
+        self.flushes = 0
+        self.flushed_events = 0
+        self.dropped_events = 0
+        self.last_flush_ms = None
+        self.max_flush_ms = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._app = app
+        self.max_size = app.config.get("ANALYTICS_BUFFER_SIZE", self.max_size)
+        self.interval = app.config.get("ANALYTICS_FLUSH_INTERVAL", self.interval)
+        self.max_pending = app.config.get(
+            "ANALYTICS_BUFFER_MAX_PENDING", self.max_pending
+        )
+        self.enabled = app.config.get("ANALYTICS_BUFFER_ENABLED", self.enabled)
+        app.extensions["analytics_buffer"] = self
+        atexit.register(self.flush)
+
+    @property
+    def depth(self):
+        return len(self._rows)
+
+    def add(self, row):
+        """Queue a single event row (a dict of AnalyticsEvent column values)."""
+        with self._lock:
+            self._rows.append(row)
+            depth = len(self._rows)
+
+        if not self.enabled:
+            self.flush()
+            return
+
+        self._ensure_thread()
+        if depth >= self.max_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write everything currently queued. Returns the number of rows written."""
+        if self._app is None:
+            return 0
+
+        from .extensions import db
+        from .models import AnalyticsEvent
+
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                with self._app.app_context():
+                    db.session.execute(insert(AnalyticsEvent), rows)
+                    db.session.commit()
+            except Exception:
+                logger.exception("Failed to flush %d analytics events", len(rows))
+                rows = self._write_one_by_one(rows)
+                if not rows:
+                    return 0
+
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+            self.flushes += 1
+            self.flushed_events += len(rows)
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms or 0, elapsed_ms)
+            logger.debug("Flushed %d analytics events in %sms", len(rows), elapsed_ms)
+            return len(rows)
+
+    def _write_one_by_one(self, rows):
+        """
+        After a failed batch, insert rows separately so one bad row (wrong
+        type, too long, a user deleted since) can't block the rest. Bad rows
+        are logged and dropped. If the database itself is unavailable, the
+        remaining rows are requeued. Returns the rows written.
+        """
+        from .extensions import db
+        from .models import AnalyticsEvent
+
+        written = []
+        with self._app.app_context():
+            for i, row in enumerate(rows):
+                try:
+                    db.session.execute(insert(AnalyticsEvent), [row])
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    if _is_unavailable(e):
+                        self._requeue(rows[i:])
+                        break
+                    logger.warning(
+                        "Dropping analytics event %r: %s", row, type(e).__name__
+                    )
+                    self.dropped_events += 1
+                else:
+                    written.append(row)
+        return written
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "max_size": self.max_size,
+            "flush_interval": self.interval,
+            "flushes": self.flushes,
+            "flushed_events": self.flushed_events,
+            "dropped_events": self.dropped_events,
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms,
+        }
+
+    def _requeue(self, rows):
+        # Put failed rows back in front, but never let a dead database grow the
+        # buffer without bound: the oldest events are dropped first.
+        with self._lock:
+            self._rows = rows + self._rows
+            overflow = len(self._rows) - self.max_pending
+            if overflow > 0:
+                del self._rows[:overflow]
+                self.dropped_events += overflow
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="analytics-buffer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Analytics buffer flush loop error")
+
+
+def _is_unavailable(error):
+    # Connection and lock errors are worth retrying, anything else is the row
+    return isinstance(error, exc.OperationalError) or getattr(
+        error, "connection_invalidated", False
+    )
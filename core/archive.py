@@ -0,0 +1,186 @@
+import gzip
+import json
+import logging
+import os
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, delete
+
+from .extensions import db
+from .models import AnalyticsEvent, RollupWatermark
+from .rollups import ROLLUPS, TOTALS, WATERMARK, hour_bucket, day_bucket, apply_counts
+
+logger = logging.getLogger(__name__)
+
+
+def archive_dir():
+    path = current_app.config.get("ANALYTICS_ARCHIVE_DIR")
+    if not path:
+        path = os.path.join(current_app.instance_path, "analytics-archive")
+    return path
+
+
+def archive_path(day, base=None):
+    """
+    One gzipped NDJSON file per day:
+    <base>/YYYY/MM/analytics_event-YYYY-MM-DD.ndjson.gz
+    """
+    return os.path.join(
+        base or archive_dir(),
+        f"{day:%Y}",
+        f"{day:%m}",
+        f"analytics_event-{day:%Y-%m-%d}.ndjson.gz",
+    )
+
+
+def archive_analytics(older_than_days=None, chunk_size=1000, pause=0.0):
+    """
+    Move analytics events older than the retention window into the archive.
+
+    Only whole days are archived, and only events the rollup job has already
+    counted, so the rollups stay complete. Each chunk is appended to its day's
+    file and then deleted in its own short transaction to keep locks brief.
+    Returns the number of events archived.
+    """
+    if older_than_days is None:
+        older_than_days = current_app.config.get("ANALYTICS_RETENTION_DAYS", 90)
+
+    cutoff = day_bucket(datetime.utcnow() - timedelta(days=older_than_days))
+    watermark = db.session.get(RollupWatermark, WATERMARK)
+    rolled_up_to = watermark.last_id if watermark else 0
+    total = 0
+
+    while True:
+        events = (
+            db.session.execute(
+                select(AnalyticsEvent)
+                .where(AnalyticsEvent.timestamp < cutoff)
+                .where(AnalyticsEvent.id <= rolled_up_to)
+                .order_by(AnalyticsEvent.id)
+                .limit(chunk_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not events:
+            break
+
+        by_day = defaultdict(list)
+        for e in events:
+            by_day[e.timestamp.date()].append(
+                {
+                    "id": e.id,
+                    "user_id": e.user_id,
+                    "event": e.event,
+                    "meta": e.meta,
+                    "timestamp": e.timestamp.isoformat(),
+                }
+            )
+
+        for day, rows in by_day.items():
+            _append(archive_path(day), rows)
+
+        ids = [e.id for e in events]
+        db.session.execute(delete(AnalyticsEvent).where(AnalyticsEvent.id.in_(ids)))
+        db.session.commit()
+
+        total += len(ids)
+        logger.info("Archived %d analytics events (up to id %d)", len(ids), ids[-1])
+        if pause:
+            time.sleep(pause)
+
+    return total
+
+
+def _append(path, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # gzip members can be concatenated, so later runs simply append
+    with gzip.open(path, "at", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+
+def archived_days(since=None, until=None, base=None):
+    """Dates that have an archive file, optionally limited to [since, until)."""
+    base = base or archive_dir()
+    days = []
+    for root, _dirs, files in os.walk(base):
+        for name in files:
+            if not (
+                name.startswith("analytics_event-") and name.endswith(".ndjson.gz")
+            ):
+                continue
+            day = date.fromisoformat(name[len("analytics_event-") : -len(".ndjson.gz")])
+            if since and day < since:
+                continue
+            if until and day >= until:
+                continue
+            days.append(day)
+    return sorted(days)
+
+
+def iter_archived_events(since=None, until=None, base=None):
+    """
+    Yield archived events as dicts with a datetime "timestamp".
+    Duplicates left behind by an interrupted archive run are skipped.
+    """
+    for day in archived_days(since, until, base):
+        seen = set()
+        with gzip.open(archive_path(day, base), "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if row["id"] in seen:
+                    continue
+                seen.add(row["id"])
+                row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                yield row
+
+
+def replay_archives(since=None, until=None, base=None):
+    """
+    Rebuild the rollups for every archived day in [since, until).
+
+    The day's rollup rows are recomputed from the archive plus any events for
+    that day still in the database that the rollup job has already counted,
+    so replaying is idempotent. Returns the number of days rebuilt.
+    """
+    days = archived_days(since, until, base)
+    watermark = db.session.get(RollupWatermark, WATERMARK)
+    rolled_up_to = watermark.last_id if watermark else 0
+
+    for day in days:
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+
+        hourly, daily = Counter(), Counter()
+        for row in iter_archived_events(day, day + timedelta(days=1), base):
+            ts = row["timestamp"]
+            hourly[(row["event"], hour_bucket(ts), row["user_id"])] += 1
+            daily[(row["event"], day_bucket(ts), row["user_id"])] += 1
+
+        live = db.session.execute(
+            select(
+                AnalyticsEvent.event, AnalyticsEvent.user_id, AnalyticsEvent.timestamp
+            )
+            .where(AnalyticsEvent.timestamp >= start)
+            .where(AnalyticsEvent.timestamp < end)
+            .where(AnalyticsEvent.id <= rolled_up_to)
+        )
+        for event, user_id, ts in live:
+            hourly[(event, hour_bucket(ts), user_id)] += 1
+            daily[(event, day_bucket(ts), user_id)] += 1
+
+        for model in (*ROLLUPS.values(), *TOTALS.values()):
+            db.session.execute(
+                delete(model).where(model.bucket >= start).where(model.bucket < end)
+            )
+        apply_counts(hourly, daily)
+        db.session.commit()
+        logger.info("Replayed %d archived events for %s", sum(daily.values()), day)
+
+    return len(days)
@@ -0,0 +1,340 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+class MemoryBackend:
+    """Per-process LRU with expiry. Fastest, but every worker has its own copy."""
+
+    shared = False
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if entry is None:
+                return MISSING
+            value, expires = entry
+            if expires is not None and expires <= time.time():
+                del self._data[(namespace, key)]
+                return MISSING
+            self._data.move_to_end((namespace, key))
+            return value
+
+    def set(self, namespace, key, value, ttl):
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[(namespace, key)] = (value, expires)
+            self._data.move_to_end((namespace, key))
+            self._evict()
+
+    def add(self, namespace, key, value, ttl):
+        """Set only if absent (or expired). Returns True if it was set."""
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if entry is not None and (entry[1] is None or entry[1] > time.time()):
+                return False
+            self._data[(namespace, key)] = (value, time.time() + ttl if ttl else None)
+            self._data.move_to_end((namespace, key))
+            self._evict()
+            return True
+
+    def delete(self, namespace, key):
+        with self._lock:
+            return self._data.pop((namespace, key), None) is not None
+
+    def _evict(self):
+        # Caller holds the lock
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                count = len(self._data)
+                self._data.clear()
+                return count
+            keys = [k for k in self._data if k[0] == namespace]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+
+class SQLiteBackend:
+    """
+    Cache table in a local SQLite file in WAL mode. Every worker on the host
+    opens the same file, so one worker's fill is every worker's hit.
+    Values are pickled.
+    """
+
+    shared = True
+
+    def __init__(self, path, max_entries=100000, purge_interval=60):
+        self.path = path
+        self.max_entries = max_entries
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._last_purge = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value BLOB,"
+            " expires REAL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+
+    def _connect(self):
+        # One connection per thread, reopened after a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace, key):
+        row = (
+            self._connect()
+            .execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ?"
+                " AND (expires IS NULL OR expires > ?)",
+                (namespace, key, time.time()),
+            )
+            .fetchone()
+        )
+        return MISSING if row is None else pickle.loads(row[0])
+
+    def set(self, namespace, key, value, ttl):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires)"
+            " VALUES (?, ?, ?, ?)",
+            (namespace, key, pickle.dumps(value), time.time() + ttl if ttl else None),
+        )
+        self._maybe_purge()
+
+    def add(self, namespace, key, value, ttl):
+        conn = self._connect()
+        now = time.time()
+        # An expired row counts as absent
+        conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND key = ? AND expires <= ?",
+            (namespace, key, now),
+        )
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO cache (namespace, key, value, expires)"
+            " VALUES (?, ?, ?, ?)",
+            (namespace, key, pickle.dumps(value), now + ttl if ttl else None),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, namespace, key):
+        cursor = self._connect().execute(
+            "DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+        )
+        return cursor.rowcount > 0
+
+    def clear(self, namespace=None):
+        if namespace is None:
+            cursor = self._connect().execute("DELETE FROM cache")
+        else:
+            cursor = self._connect().execute(
+                "DELETE FROM cache WHERE namespace = ?", (namespace,)
+            )
+        return cursor.rowcount
+
+    def _maybe_purge(self):
+        now = time.time()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        conn = self._connect()
+        conn.execute("DELETE FROM cache WHERE expires <= ?", (now,))
+        # Past the size cap, drop the entries closest to expiring
+        conn.execute(
+            "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache"
+            " ORDER BY expires IS NULL, expires"
+            " LIMIT max(0, (SELECT COUNT(*) FROM cache) - ?))",
+            (self.max_entries,),
+        )
+
+
+class Cache:
+    """
+    Namespaced key/value cache with TTLs, explicit invalidation and per
+    namespace hit/miss counts (also reported to the metrics registry).
+
+    CACHE_BACKEND is "memory" (per-process LRU) or "sqlite" (a WAL file at
+    CACHE_SQLITE_PATH shared by every worker on the host).
+    """
+
+    def __init__(self, app=None):
+        self.backend = MemoryBackend()
+        self.default_ttl = 300
+        self.lock_timeout = 10
+        self._flight = SingleFlight()
+        self._stats = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "sets": 0, "deletes": 0, "coalesced": 0}
+        )
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.default_ttl = app.config.get("CACHE_DEFAULT_TTL", self.default_ttl)
+        self.lock_timeout = app.config.get("CACHE_LOCK_TIMEOUT", self.lock_timeout)
+        kind = app.config.get("CACHE_BACKEND", "memory")
+        if kind == "sqlite":
+            path = app.config.get("CACHE_SQLITE_PATH") or os.path.join(
+                app.instance_path, "cache.sqlite"
+            )
+            self.backend = SQLiteBackend(
+                path, max_entries=app.config.get("CACHE_MAX_ENTRIES", 100000)
+            )
+        elif kind == "memory":
+            self.backend = MemoryBackend(app.config.get("CACHE_MAX_ENTRIES", 10000))
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND {kind!r}")
+        app.extensions["cache"] = self
+
+    def get(self, namespace, key, default=None):
+        try:
+            value = self.backend.get(namespace, str(key))
+        except Exception:
+            logger.exception("Cache get failed for %s:%s", namespace, key)
+            value = MISSING
+        self._count(namespace, "hits" if value is not MISSING else "misses")
+        return default if value is MISSING else value
+
+    def set(self, namespace, key, value, ttl=None):
+        try:
+            self.backend.set(
+                namespace, str(key), value, self.default_ttl if ttl is None else ttl
+            )
+        except Exception:
+            logger.exception("Cache set failed for %s:%s", namespace, key)
+            return
+        self._count(namespace, "sets")
+
+    def delete(self, namespace, key):
+        try:
+            deleted = self.backend.delete(namespace, str(key))
+        except Exception:
+            logger.exception("Cache delete failed for %s:%s", namespace, key)
+            return False
+        self._count(namespace, "deletes")
+        return deleted
+
+    def invalidate(self, namespace):
+        """Drop every key in a namespace. Returns how many were removed."""
+        try:
+            return self.backend.clear(namespace)
+        except Exception:
+            logger.exception("Cache invalidate failed for %s", namespace)
+            return 0
+
+    def get_or_set(self, namespace, key, compute, ttl=None):
+        """
+        Cached value, or compute() stored for ttl. None results aren't cached.
+
+        Concurrent misses for the same key are single-flighted: one thread
+        computes while the others in this worker wait for its result. With a
+        shared backend, a lock entry in the cache does the same across
+        workers, so an expired key is recomputed once per host, not once per
+        request.
+        """
+        value = self.get(namespace, key, MISSING)
+        if value is not MISSING:
+            return value
+
+        key = str(key)
+        ran = []
+
+        def fill():
+            ran.append(True)
+            return self._fill(namespace, key, compute, ttl)
+
+        value = self._flight.do((namespace, key), fill, timeout=self.lock_timeout)
+        if not ran:
+            self._count(namespace, "coalesced")
+        return value
+
+    def _fill(self, namespace, key, compute, ttl):
+        lock_namespace = f"lock:{namespace}"
+        locked = False
+        if self.backend.shared:
+            try:
+                locked = self.backend.add(
+                    lock_namespace, key, os.getpid(), self.lock_timeout
+                )
+            except Exception:
+                logger.exception("Cache lock failed for %s:%s", namespace, key)
+                locked = None
+            if locked is False:
+                # Another worker is computing it, wait for its result
+                value = self._wait_for(namespace, key, lock_namespace)
+                if value is not MISSING:
+                    self._count(namespace, "coalesced")
+                    return value
+
+        try:
+            value = compute()
+            if value is not None:
+                self.set(namespace, key, value, ttl)
+            return value
+        finally:
+            if locked:
+                try:
+                    self.backend.delete(lock_namespace, key)
+                except Exception:
+                    # The lock entry expires after lock_timeout anyway
+                    logger.exception("Cache unlock failed for %s:%s", namespace, key)
+
+    def _wait_for(self, namespace, key, lock_namespace, poll=0.025):
+        deadline = time.monotonic() + self.lock_timeout
+        try:
+            while time.monotonic() < deadline:
+                time.sleep(poll)
+                value = self.backend.get(namespace, key)
+                if value is not MISSING:
+                    return value
+                if self.backend.get(lock_namespace, key) is MISSING:
+                    break  # the other worker finished without caching anything
+        except Exception:
+            logger.exception("Cache wait failed for %s:%s", namespace, key)
+        return MISSING
+
+    def _count(self, namespace, field):
+        with self._lock:
+            self._stats[namespace][field] += 1
+        if field in ("hits", "misses"):
+            from .extensions import metrics
+
+            metrics.cache_result(namespace, hit=field == "hits")
+
+    def stats(self):
+        """Counts for this worker, per namespace."""
+        with self._lock:
+            stats = {ns: dict(s) for ns, s in self._stats.items()}
+        for s in stats.values():
+            lookups = s["hits"] + s["misses"]
+            s["hit_rate"] = round(s["hits"] / lookups, 3) if lookups else None
+        return {"backend": type(self.backend).__name__, "namespaces": stats}
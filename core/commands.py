@@ -0,0 +1,112 @@
+import time
+
+import click
+from flask.cli import AppGroup
+
+analytics_cli = AppGroup("analytics", help="Analytics maintenance jobs.")
+
+
+@analytics_cli.command("rollup")
+@click.option("--batch-size", default=5000, show_default=True)
+@click.option(
+    "--every",
+    type=float,
+    default=None,
+    help="Keep running, rolling up again every N seconds.",
+)
+def rollup_command(batch_size, every):
+    """Fold new analytics events into the hourly/daily rollup tables."""
+    from .rollups import rollup_analytics
+
+    while True:
+        count = rollup_analytics(batch_size=batch_size)
+        click.echo(f"Rolled up {count} events")
+        if every is None:
+            break
+        time.sleep(every)
+
+
+@analytics_cli.command("archive")
+@click.option(
+    "--days",
+    type=int,
+    default=None,
+    help="Archive events older than this many days (default ANALYTICS_RETENTION_DAYS).",
+)
+@click.option("--chunk-size", default=1000, show_default=True)
+@click.option("--pause", default=0.0, help="Seconds to sleep between chunks.")
+def archive_command(days, chunk_size, pause):
+    """Move old analytics events into compressed daily archive files."""
+    from .archive import archive_analytics
+
+    count = archive_analytics(older_than_days=days, chunk_size=chunk_size, pause=pause)
+    click.echo(f"Archived {count} events")
+
+
+@analytics_cli.command("replay")
+@click.option("--since", type=click.DateTime(["%Y-%m-%d"]), default=None)
+@click.option("--until", type=click.DateTime(["%Y-%m-%d"]), default=None)
+def replay_command(since, until):
+    """Rebuild rollups for archived days from the archive files."""
+    from .archive import replay_archives
+
+    days = replay_archives(
+        since.date() if since else None, until.date() if until else None
+    )
+    click.echo(f"Replayed {days} archived days")
+
+
+counters_cli = AppGroup("counters", help="Admin overview counters.")
+
+
+@counters_cli.command("reconcile")
+@click.option(
+    "--every",
+    type=float,
+    default=None,
+    help="Keep running, reconciling again every N seconds.",
+)
+def reconcile_command(every):
+    """Reset the row counters to the real table counts."""
+    from .counters import reconcile_counters
+
+    while True:
+        drift = reconcile_counters()
+        click.echo(", ".join(f"{name}: {d}" for name, d in drift.items()))
+        if every is None:
+            break
+        time.sleep(every)
+
+
+seed_cli = AppGroup("seed", help="Synthetic data for local runs and benchmarks.")
+
+
+@seed_cli.command("generate")
+@click.option("--users", default=100, show_default=True)
+@click.option("--days", default=90, show_default=True)
+@click.option("--leads", default=0, show_default=True)
+@click.option("--seed", "seed_value", default=0, show_default=True, help="Random seed.")
+@click.option("--batch-size", default=5000, show_default=True)
+@click.option(
+    "--end-date",
+    type=click.DateTime(["%Y-%m-%d"]),
+    default=None,
+    help="Last day of generated records (default today).",
+)
+def generate_command(users, days, leads, seed_value, batch_size, end_date):
+    """Bulk-insert deterministic users, records, cycles, analytics and leads."""
+    from .seed import generate
+
+    started = time.perf_counter()
+    totals = generate(
+        users,
+        days,
+        leads=leads,
+        seed=seed_value,
+        batch_size=batch_size,
+        end_date=end_date.date() if end_date else None,
+    )
+    click.echo(
+        ", ".join(f"{table}: {n}" for table, n in totals.items())
+        + f" in {time.perf_counter() - started:.1f}s"
+    )
@@ -0,0 +1,126 @@
+import gzip
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional, gzip/deflate still work without it
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "application/javascript",
+)
+
+
+class _Compressor:
+    """One interface over zlib (gzip/deflate) and brotli stream compressors."""
+
+    def __init__(self, encoding, level):
+        self.encoding = encoding
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=min(level, 11))
+        else:
+            # wbits 31 writes a gzip container, 15 a zlib one (HTTP "deflate")
+            wbits = 31 if encoding == "gzip" else 15
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, wbits)
+
+    def chunk(self, data):
+        """Compress data and flush it, so the client can decode it right away."""
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.flush()
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == "br":
+            return self._obj.finish()
+        return self._obj.flush()
+
+
+def compress(data, encoding, level):
+    if encoding == "br":
+        return brotli.compress(data, quality=min(level, 11))
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return zlib.compress(data, level)
+
+
+def _compress_stream(chunks, compressor):
+    # Every chunk is flushed as soon as it's produced, so streaming responses
+    # send their first bytes exactly as early as they would uncompressed.
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = compressor.chunk(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def init_compression(app):
+    """
+    Compress responses with brotli, gzip or deflate, negotiated through
+    Accept-Encoding. Responses are compressed when at least
+    COMPRESSION_MIN_SIZE bytes; streamed ones of unknown length always,
+    chunk by chunk.
+    """
+    if not app.config.get("COMPRESSION_ENABLED", True):
+        return
+
+    min_size = app.config.get("COMPRESSION_MIN_SIZE", 1024)
+    level = app.config.get("COMPRESSION_LEVEL", 6)
+    compressible = set(app.config.get("COMPRESSION_MIMETYPES", DEFAULT_MIMETYPES))
+    offered = (["br"] if brotli is not None else []) + ["gzip", "deflate"]
+
+    @app.after_request
+    def _compress_response(response):
+        if (
+            response.mimetype not in compressible
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if (
+            request.method == "HEAD"
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or "no-transform" in response.headers.get("Cache-Control", "")
+        ):
+            return response
+
+        encoding = request.accept_encodings.best_match(offered)
+        if encoding is None:
+            return response
+
+        length = response.content_length
+        if length is not None and length < min_size:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_stream(
+                response.response, _Compressor(encoding, level)
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress(data, encoding, level))
+
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak)
+        return response
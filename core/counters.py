@@ -0,0 +1,118 @@
+import logging
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import event, select, func, update, text
+from sqlalchemy.orm import Session
+
+from .extensions import db
+from .models import User, UserDailyRecord, Leads, TableCounter
+
+logger = logging.getLogger(__name__)
+
+# Counter name -> model. Names match the table names.
+COUNTED = {
+    "user": User,
+    "user_daily_record": UserDailyRecord,
+    "leads": Leads,
+}
+_NAMES = {model: name for name, model in COUNTED.items()}
+
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_rows(session, _flush_context):
+    deltas = Counter()
+    for obj in session.new:
+        name = _NAMES.get(type(obj))
+        if name:
+            deltas[name] += 1
+    for obj in session.deleted:
+        name = _NAMES.get(type(obj))
+        if name:
+            deltas[name] -= 1
+
+    # Same connection and transaction as the flush, so counts commit or roll
+    # back together with the rows they describe.
+    connection = session.connection()
+    for name, delta in deltas.items():
+        if delta:
+            increment(connection, name, delta)
+
+
+@event.listens_for(Session, "after_bulk_delete")
+def _count_bulk_deleted_rows(delete_context):
+    name = _NAMES.get(delete_context.mapper.class_)
+    rowcount = delete_context.result.rowcount
+    if name and rowcount and rowcount > 0:
+        increment(delete_context.session.connection(), name, -rowcount)
+
+
+def increment(connection, name, delta):
+    """
+    Adjust a counter by delta. Use this after Core/bulk statements on a counted
+    table, which the ORM flush hook can't see.
+    """
+    connection.execute(
+        update(TableCounter)
+        .where(TableCounter.name == name)
+        .values(value=TableCounter.value + delta)
+    )
+
+
+def get_counts(approximate=False):
+    """
+    Row counts for every counted table.
+    Exact mode reads the counters table. Approximate mode reads the planner's
+    row estimate on PostgreSQL and uses the counters everywhere else.
+    A table without a counter row yet falls back to COUNT(*).
+    """
+    counts = {}
+    if approximate and db.session.get_bind().dialect.name == "postgresql":
+        rows = db.session.execute(
+            text(
+                "SELECT relname, reltuples FROM pg_class "
+                "WHERE relkind = 'r' AND relname = ANY(:names)"
+            ),
+            {"names": list(COUNTED)},
+        )
+        # reltuples is -1 (or 0) until the table has been analyzed
+        counts = {name: int(n) for name, n in rows if n and n > 0}
+
+    missing = [name for name in COUNTED if name not in counts]
+    if missing:
+        rows = db.session.execute(
+            select(TableCounter.name, TableCounter.value).where(
+                TableCounter.name.in_(missing)
+            )
+        )
+        counts.update({name: int(value) for name, value in rows})
+
+    for name, model in COUNTED.items():
+        if name not in counts:
+            counts[name] = db.session.scalar(select(func.count()).select_from(model))
+
+    return counts
+
+
+def reconcile_counters():
+    """Reset every counter to its table's real COUNT(*). Returns the drift found."""
+    drift = {}
+
+    for name, model in COUNTED.items():
+        actual = db.session.scalar(select(func.count()).select_from(model))
+        current = db.session.get(TableCounter, name)
+        if current is None:
+            db.session.add(
+                TableCounter(name=name, value=actual, reconciled_at=datetime.utcnow())
+            )
+            drift[name] = None
+            continue
+
+        drift[name] = actual - current.value
+        if drift[name]:
+            logger.warning("Counter %s drifted by %d, resetting", name, drift[name])
+        current.value = actual
+        current.reconciled_at = datetime.utcnow()
+
+    db.session.commit()
+    return drift
@@ -0,0 +1,99 @@
+from flask import has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from .metrics import TimedQueuePool
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def configure_engine(app):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings. Options set
+    explicitly in SQLALCHEMY_ENGINE_OPTIONS win. Must run before db.init_app.
+    """
+    config = app.config
+    uri = config.get("SQLALCHEMY_DATABASE_URI")
+    if not uri:
+        return
+    url = make_url(uri)
+    options = {}
+
+    # In-memory SQLite is a single StaticPool connection, nothing to tune
+    if not _is_memory_sqlite(url):
+        options.update(
+            pool_size=config.get("DB_POOL_SIZE", 5),
+            max_overflow=config.get("DB_MAX_OVERFLOW", 10),
+            pool_timeout=config.get("DB_POOL_TIMEOUT", 30),
+            pool_recycle=config.get("DB_POOL_RECYCLE", 1800),
+            pool_pre_ping=config.get("DB_POOL_PRE_PING", True),
+        )
+        if config.get("METRICS_ENABLED"):
+            # Time pool checkouts for db_pool_checkout_seconds
+            options["poolclass"] = TimedQueuePool
+
+    connect_timeout = config.get("DB_CONNECT_TIMEOUT")
+    if connect_timeout and url.get_backend_name() == "postgresql":
+        options["connect_args"] = {"connect_timeout": int(connect_timeout)}
+
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+
+def init_statement_timeout(app):
+    """
+    Cap each PostgreSQL statement run while serving a request at
+    DB_STATEMENT_TIMEOUT_MS. It's SET LOCAL at the start of every transaction
+    in a request, so it ends with the transaction and never applies to the
+    CLI, migrations or scripts, whose statements can legitimately run long.
+    """
+    from .extensions import db
+
+    timeout_ms = app.config.get("DB_STATEMENT_TIMEOUT_MS")
+    if not timeout_ms:
+        return
+    statement = f"SET LOCAL statement_timeout = {int(timeout_ms)}"
+
+    def _set_timeout(connection):
+        if not has_request_context():
+            return
+        # On the DBAPI cursor, so it doesn't count against query budgets
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "postgresql":
+                event.listen(engine, "begin", _set_timeout)
+
+
+def init_sqlite_pragmas(app):
+    """
+    Put every file-backed SQLite engine in WAL mode with synchronous=NORMAL,
+    a memory-mapped read window and a busy timeout, so concurrent readers
+    don't block on a writer.
+    """
+    from .extensions import db
+
+    mmap_size = app.config.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+    busy_timeout = app.config.get("SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+    def _set_pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+            cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite" and not _is_memory_sqlite(engine.url):
+                event.listen(engine, "connect", _set_pragmas)
@@ -1,9 +1,35 @@
+import click
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
-db = SQLAlchemy()
-migrate = Migrate()
+from .analytics_buffer import AnalyticsBuffer
+from .cache import Cache
+from .metrics import MetricsRegistry
+from .replicas import RoutingSession
+
+
+class LazyMigrate:
+    """
+    Flask-Migrate pulls in Alembic, the slowest import in the app, and only
+    the `flask db` commands use it. It's set up when the Flask CLI creates
+    the app (or with MIGRATIONS_ALWAYS) and skipped in web workers.
+    """
+
+    def init_app(self, app, db):
+        if click.get_current_context(silent=True) is None and not app.config.get(
+            "MIGRATIONS_ALWAYS"
+        ):
+            return
+        from flask_migrate import Migrate
+
+        Migrate(app, db)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+migrate = LazyMigrate()
 cors = CORS()
 jwt = JWTManager()
+analytics_buffer = AnalyticsBuffer()
+metrics = MetricsRegistry()
+cache = Cache()
@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta
 
+from sqlalchemy import insert
+
 
 def generate_ultradian_cycles(
     wake_time_str="06:00:00", peak_minutes=90, trough_minutes=20, cycles=5, grog=20
@@ -33,3 +35,20 @@ def generate_ultradian_cycles(
         wake_time = trough_end  # move to the next cycle
 
     return results
+
+
+def dialect_insert(model, dialect_name):
+    """
+    Return an INSERT for the given dialect that supports on_conflict_do_*.
+    Falls back to a plain insert for dialects without upsert support.
+    """
+    # Dialect modules are imported here, the PostgreSQL one is slow to load
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects import postgresql
+
+        return postgresql.insert(model)
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects import sqlite
+
+        return sqlite.insert(model)
+    return insert(model)
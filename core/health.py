@@ -0,0 +1,127 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import text
+
+from .extensions import db
+from .outbound import http_session
+from .replicas import replica_health
+
+_cache = {"result": None, "expires": 0.0}
+_lock = threading.Lock()
+
+
+def deep_health():
+    """
+    Database and weather provider status, cached for HEALTH_CACHE_SECONDS.
+    One caller probes at a time. While it does, the others get the previous
+    result, or wait at most as long as the probe's own timeouts allow.
+    """
+    config = current_app.config
+    ttl = config.get("HEALTH_CACHE_SECONDS", 5)
+    wait = config.get("HEALTH_DB_TIMEOUT", 2) + config.get("HEALTH_WEATHER_TIMEOUT", 2)
+
+    result = _cached()
+    if result is None:
+        if _lock.acquire(timeout=0 if _cache["result"] else wait):
+            try:
+                result = _cached()
+                if result is None:
+                    _cache["result"] = _probe()
+                    _cache["expires"] = time.monotonic() + ttl
+                    result = dict(_cache["result"], cached=False)
+            finally:
+                _lock.release()
+        elif _cache["result"]:
+            result = dict(_cache["result"], cached=True)
+        else:
+            result = {
+                "status": "down",
+                "checked_at": time.time(),
+                "database": {"ok": False, "error": "ProbeTimeout"},
+                "cached": False,
+            }
+
+    # Live, not cached: this worker's admission queue and shed counts
+    admission = current_app.extensions.get("admission")
+    if admission is not None:
+        result["admission"] = admission.stats()
+    return result
+
+
+def _cached():
+    result = _cache["result"]
+    if result is None or time.monotonic() >= _cache["expires"]:
+        return None
+    return dict(result, cached=True)
+
+
+def _probe():
+    database = check_database()
+    weather = check_weather(current_app.config.get("HEALTH_WEATHER_TIMEOUT", 2))
+    if not database["ok"]:
+        status = "down"
+    elif not weather["ok"]:
+        status = "degraded"
+    else:
+        status = "ok"
+    result = {
+        "status": status,
+        "checked_at": time.time(),
+        "database": database,
+        "weather": weather,
+    }
+    replicas = replica_health()
+    if replicas is not None:
+        result["replicas"] = replicas
+        if status == "ok" and not all(r["ok"] for r in replicas.values()):
+            result["status"] = "degraded"
+    return result
+
+
+def check_database():
+    started = time.perf_counter()
+    timeout_ms = int(current_app.config.get("HEALTH_DB_TIMEOUT", 2) * 1000)
+    try:
+        with db.engine.connect() as connection:
+            if connection.dialect.name == "postgresql":
+                connection.execute(text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+            connection.execute(text("SELECT 1"))
+        result = {"ok": True}
+    except Exception as e:
+        # Only the class: messages can carry hostnames and credentials
+        result = {"ok": False, "error": type(e).__name__}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    result["pool"] = pool_stats()
+    return result
+
+
+def pool_stats():
+    pool = db.engine.pool
+    stats = {"class": type(pool).__name__}
+    # Only QueuePool and its subclasses keep counts
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            stats[name] = method()
+    return stats
+
+
+def check_weather(timeout):
+    import requests
+
+    from utils.weather import WEATHER_API_URL
+
+    started = time.perf_counter()
+    try:
+        response = http_session().get(
+            WEATHER_API_URL,
+            params={"latitude": 0, "longitude": 0, "current": "temperature_2m"},
+            timeout=timeout,
+        )
+        result = {"ok": response.status_code < 500, "status_code": response.status_code}
+    except requests.RequestException as e:
+        result = {"ok": False, "error": type(e).__name__}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
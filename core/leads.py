@@ -0,0 +1,96 @@
+import logging
+import threading
+
+from flask import current_app
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from .bloom import BloomFilter
+from .counters import increment
+from .extensions import db, metrics
+from .functions import dialect_insert
+from .models import Leads
+
+logger = logging.getLogger(__name__)
+
+_seen_lock = threading.Lock()
+
+
+def _seen_emails():
+    """
+    The app's Bloom filter of captured emails, loaded from the table on first
+    use. A filter that has reached its capacity no longer keeps its error
+    rate, so it is rebuilt from the table at twice the size.
+    """
+    seen = current_app.extensions.get("leads_bloom")
+    if seen is None or seen.count >= seen.capacity:
+        with _seen_lock:
+            seen = current_app.extensions.get("leads_bloom")
+            if seen is None or seen.count >= seen.capacity:
+                seen = current_app.extensions["leads_bloom"] = _load_seen_emails(seen)
+    return seen
+
+
+def _load_seen_emails(previous):
+    rows = db.session.scalar(select(func.count()).select_from(Leads))
+    capacity = max(
+        current_app.config.get("LEADS_BLOOM_CAPACITY", 200_000),
+        previous.capacity * 2 if previous else 0,
+        rows * 2,
+    )
+    if previous is not None:
+        logger.info("Leads Bloom filter is full, rebuilding it for %d emails", capacity)
+
+    bloom = BloomFilter(
+        capacity=capacity,
+        error_rate=current_app.config.get("LEADS_BLOOM_ERROR_RATE", 0.0001),
+    )
+    emails = db.session.execute(
+        select(Leads.email).execution_options(yield_per=5000)
+    ).scalars()
+    for email in emails:
+        if email:
+            bloom.add(email)
+    return bloom
+
+
+def capture_lead(email, name):
+    """
+    Store a lead if its email is new. Returns True when a row was inserted.
+
+    Repeat submissions are usually answered by the Bloom filter without a
+    database round trip. Anything that gets past it is an insert that does
+    nothing on an email conflict, so duplicates never raise. A hit only
+    means "maybe seen": it is trusted while the filter is under capacity,
+    where false positives stay near LEADS_BLOOM_ERROR_RATE, and otherwise
+    the insert runs anyway.
+    """
+    seen = _seen_emails()
+    if email in seen and seen.count < seen.capacity:
+        metrics.cache_result("leads_bloom", hit=True)
+        return False
+    metrics.cache_result("leads_bloom", hit=False)
+
+    dialect = db.session.get_bind().dialect.name
+    values = {"email": email, "name": name}
+
+    if dialect in ("postgresql", "sqlite"):
+        stmt = dialect_insert(Leads, dialect).on_conflict_do_nothing(
+            index_elements=["email"]
+        )
+        created = db.session.execute(stmt.values(values)).rowcount == 1
+    else:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Leads).values(values))
+            created = True
+        except IntegrityError:
+            created = False
+
+    if created:
+        # Core inserts bypass the ORM flush hook that maintains the counter
+        increment(db.session.connection(), "leads", 1)
+    db.session.commit()
+
+    seen.add(email)
+    return created
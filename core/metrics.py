@@ -0,0 +1,295 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+
+from flask import request
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Values of workers that have exited, see MetricsRegistry
+AGGREGATE = "aggregate.json"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help text)
+METRICS = {
+    "http_requests_total": ("counter", "HTTP requests by endpoint and status."),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency."),
+    "db_pool_checkout_seconds": (
+        "histogram",
+        "Time spent waiting for a pooled DB connection.",
+    ),
+    "db_pool_checkout_timeouts_total": (
+        "counter",
+        "Pool checkouts that gave up after DB_POOL_TIMEOUT.",
+    ),
+    "cache_requests_total": (
+        "counter",
+        "Cache lookups by cache and result (hit/miss).",
+    ),
+    "http_requests_shed_total": (
+        "counter",
+        "Requests rejected with a 503 by admission control.",
+    ),
+    "http_admission_wait_seconds": (
+        "histogram",
+        "Time requests spent queued for admission.",
+    ),
+}
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus-style registry (counters and histograms).
+
+    Every gunicorn worker keeps its own values and periodically writes them to
+    <METRICS_MULTIPROC_DIR>/metrics-<pid>.json. The worker that serves /metrics
+    sums every file in the directory, so the output covers all workers on the
+    host. Without a directory only the serving worker's values are reported.
+
+    When a worker exits, gunicorn.conf.py renames its file to dead-<pid>.json
+    and the next /metrics folds it into aggregate.json, so host-wide totals
+    never go down while the master runs. The master empties the directory
+    when it starts.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._last_write = 0.0
+        self.enabled = False
+        self.directory = None
+        self.write_interval = 1.0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("METRICS_ENABLED", False)
+        self.directory = app.config.get("METRICS_MULTIPROC_DIR")
+        app.extensions["metrics"] = self
+        if not self.enabled:
+            return
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            atexit.register(self.write)
+
+        app.before_request(self._start_timer)
+        app.after_request(self._record_request)
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {
+                    "buckets": list(buckets),
+                    "counts": [0] * len(buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(hist["buckets"]):
+                if value <= bound:
+                    hist["counts"][i] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def cache_result(self, cache, hit):
+        self.inc("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+    def _start_timer(self):
+        # Admission control may have started it already, see core/admission.py
+        request.environ.setdefault("metrics.start", time.perf_counter())
+
+    def _record_request(self, response):
+        started = request.environ.get("metrics.start")
+        if started is None:
+            return response
+
+        endpoint = request.endpoint or "unmatched"
+        labels = {
+            "blueprint": request.blueprint or "app",
+            "endpoint": endpoint,
+            "method": request.method,
+        }
+        self.observe(
+            "http_request_duration_seconds", time.perf_counter() - started, **labels
+        )
+        self.inc("http_requests_total", status=str(response.status_code), **labels)
+
+        if self.directory and time.monotonic() - self._last_write > self.write_interval:
+            self.write()
+        return response
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [[n, dict(l), v] for (n, l), v in self._counters.items()],
+                "histograms": [
+                    [n, dict(l), dict(h, counts=list(h["counts"]))]
+                    for (n, l), h in self._histograms.items()
+                ],
+            }
+
+    def write(self):
+        """Write this worker's values to the shared directory."""
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+        self._last_write = time.monotonic()
+
+    def _collect(self):
+        if not self.directory:
+            return [self.snapshot()]
+
+        self.write()
+        self._fold_dead_workers()
+        paths = [os.path.join(self.directory, AGGREGATE)]
+        paths += glob.glob(os.path.join(self.directory, "metrics-*.json"))
+        return [snap for snap in map(_load, paths) if snap is not None]
+
+    def _fold_dead_workers(self):
+        """Add exited workers' files (dead-<pid>.json) into aggregate.json."""
+        pattern = os.path.join(self.directory, "dead-*.json")
+        if not glob.glob(pattern):
+            return
+
+        import fcntl
+
+        aggregate_path = os.path.join(self.directory, AGGREGATE)
+        with open(os.path.join(self.directory, "aggregate.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            aggregate = _load(aggregate_path) or {"counters": [], "histograms": []}
+            # Files already in the aggregate whose removal didn't happen
+            folded = {
+                name
+                for name in aggregate.get("folded", [])
+                if os.path.exists(os.path.join(self.directory, name))
+            }
+            snapshots, names = [aggregate], []
+            for path in glob.glob(pattern):
+                name = os.path.basename(path)
+                snap = None if name in folded else _load(path)
+                if snap is not None:
+                    snapshots.append(snap)
+                    names.append(name)
+
+            merged = _as_snapshot(*_merge(snapshots))
+            merged["folded"] = sorted(folded | set(names))
+            tmp = f"{aggregate_path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(merged, f)
+            os.replace(tmp, aggregate_path)
+            for name in merged["folded"]:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        counters, histograms = _merge(self._collect())
+
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (n, labels), value in sorted(counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{_labels(labels)} {value}")
+            else:
+                for (n, labels), hist in sorted(histograms.items()):
+                    if n != name:
+                        continue
+                    for bound, count in zip(hist["buckets"], hist["counts"]):
+                        le = labels + (("le", repr(float(bound))),)
+                        lines.append(f"{name}_bucket{_labels(le)} {count}")
+                    inf = labels + (("le", "+Inf"),)
+                    lines.append(f"{name}_bucket{_labels(inf)} {hist['count']}")
+                    lines.append(f"{name}_sum{_labels(labels)} {hist['sum']}")
+                    lines.append(f"{name}_count{_labels(labels)} {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge(snapshots):
+    """Sum snapshots into ({(name, labels): value}, {(name, labels): histogram})."""
+    counters, histograms = {}, {}
+    for snap in snapshots:
+        for name, labels, value in snap["counters"]:
+            key = (name, tuple(sorted(labels.items())))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, hist in snap["histograms"]:
+            key = (name, tuple(sorted(labels.items())))
+            merged = histograms.get(key)
+            if merged is None:
+                histograms[key] = dict(hist, counts=list(hist["counts"]))
+                continue
+            merged["counts"] = [a + b for a, b in zip(merged["counts"], hist["counts"])]
+            merged["sum"] += hist["sum"]
+            merged["count"] += hist["count"]
+    return counters, histograms
+
+
+def _as_snapshot(counters, histograms):
+    return {
+        "counters": [[n, dict(l), v] for (n, l), v in counters.items()],
+        "histograms": [[n, dict(l), h] for (n, l), h in histograms.items()],
+    }
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        from .extensions import metrics
+
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.inc("db_pool_checkout_timeouts_total")
+            raise
+        finally:
+            metrics.observe(
+                "db_pool_checkout_seconds",
+                time.perf_counter() - started,
+                buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+            )
@@ -1,7 +1,8 @@
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, date, time
 
-from core.extensions import db
+from core.extensions import db, cache
 
 
 class User(db.Model):
@@ -17,6 +18,16 @@ class User(db.Model):
 
     is_admin = db.Column(db.Boolean, default=False)
 
+    # Admin prefix search, see migration e5b90c3d7a18. varchar_pattern_ops lets
+    # PostgreSQL use it for LIKE 'prefix%' under any collation
+    __table_args__ = (
+        db.Index(
+            "ix_user_email_lower",
+            db.func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "varchar_pattern_ops"},
+        ),
+    )
+
     def latest_record(self):
         return (
             UserDailyRecord.query.filter_by(user_id=self.id)
@@ -44,34 +55,94 @@ class User(db.Model):
         r = self.latest_record()
         return r.mood if r else None
 
-    def latest_record(self):
-        return (
-            UserDailyRecord.query.filter_by(user_id=self.id)
-            .order_by(UserDailyRecord.date.desc())
-            .first()
-        )
+    BASELINE_METRICS = ("hrv", "rhr", "sleep_duration")
 
     def get_baseline(self, metric: str, days: int = 7):
         """
         Generic baseline calculator for a given metric (e.g. 'hrv', 'rhr', 'sleep_duration')
-        Excludes today's record.
+        Averages the last `days` records before today, so saving today's
+        record doesn't change it. Cached for BASELINE_CACHE_TTL, or until
+        clear_baselines().
         """
-        valid_metrics = {"hrv", "rhr", "sleep_duration"}
-        if metric not in valid_metrics:
+        if metric not in self.BASELINE_METRICS:
             raise ValueError(f"Unsupported metric: {metric}")
 
-        records = (
-            UserDailyRecord.query.filter_by(user_id=self.id)
-            .filter(getattr(UserDailyRecord, metric).isnot(None))
+        ttl = (
+            current_app.config.get("BASELINE_CACHE_TTL", 900)
+            if has_app_context()
+            else 900
+        )
+        return cache.get_or_set(
+            "baselines",
+            f"{self.id}:{metric}:{days}:{date.today()}",
+            lambda: self._compute_baseline(metric, days),
+            ttl=ttl,
+        )
+
+    def clear_baselines(self, days: int = 7):
+        """
+        Forget cached baselines after one of this user's records changes.
+        With the memory cache backend this only clears this worker's copy,
+        other workers pick up the change within BASELINE_CACHE_TTL.
+        """
+        User.clear_baselines_for(self.id, days)
+
+    @classmethod
+    def clear_baselines_for(cls, user_id, days: int = 7):
+        """
+        clear_baselines() by id, for after a commit. Clearing before it lets a
+        concurrent request cache a baseline from the old rows again, and the
+        commit expires the instance, so reading .id would cost a query.
+        """
+        for metric in cls.BASELINE_METRICS:
+            cache.delete("baselines", f"{user_id}:{metric}:{days}:{date.today()}")
+
+    def get_wake_time(self, day):
+        """
+        Wake time logged for `day` as "HH:MM:SS", or None. Cached for
+        SCHEDULE_CACHE_TTL, or until clear_wake_time_for(), so a burst of
+        schedule requests runs one query between them.
+        """
+        ttl = (
+            current_app.config.get("SCHEDULE_CACHE_TTL", 300)
+            if has_app_context()
+            else 300
+        )
+        return cache.get_or_set(
+            "wake_times",
+            f"{self.id}:{day}",
+            lambda: self._load_wake_time(day),
+            ttl=ttl,
+        )
+
+    @staticmethod
+    def clear_wake_time_for(user_id, day):
+        """Forget the cached wake time after the user's record for `day` changes."""
+        cache.delete("wake_times", f"{user_id}:{day}")
+
+    def _load_wake_time(self, day):
+        wake_time = db.session.scalar(
+            db.select(UserDailyRecord.wake_time)
+            .filter_by(user_id=self.id, date=day)
+            .limit(1)
+        )
+        return wake_time.strftime("%H:%M:%S") if wake_time else None
+
+    def _compute_baseline(self, metric, days):
+        values = (
+            db.session.query(getattr(UserDailyRecord, metric))
+            .filter(
+                UserDailyRecord.user_id == self.id,
+                UserDailyRecord.date < date.today(),
+                getattr(UserDailyRecord, metric).isnot(None),
+            )
             .order_by(UserDailyRecord.date.desc())
-            .limit(days + 1)
+            .limit(days)
             .all()
         )
+        recent = [v for (v,) in values]
 
-        today = date.today()
-        recent = [getattr(r, metric) for r in records if r.date != today]
-
-        if not recent or len(recent) < 2:
+        if len(recent) < 2:
             return None
 
         return round(sum(recent) / len(recent), 2)
@@ -127,8 +198,8 @@ class UserDailyRecord(db.Model):
     def as_dict(self):
         return {
             "id": self.id,
-            "date": self.date.isoformat(),
-            "wake_time": self.wake_time.isoformat(),
+            "date": self.date,
+            "wake_time": self.wake_time,
             "hrv": self.hrv,
             "rhr": self.rhr,
             "sleep_duration": self.sleep_duration,
@@ -157,7 +228,16 @@ class Leads(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True)
     name = db.Column(db.String(120))
-    timestamp = db.Column(db.DateTime, default=datetime.now())
+    timestamp = db.Column(db.DateTime, default=datetime.now)
+
+    # Admin prefix search, like User's
+    __table_args__ = (
+        db.Index(
+            "ix_leads_email_lower",
+            db.func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "varchar_pattern_ops"},
+        ),
+    )
 
 
 class AnalyticsEvent(db.Model):
@@ -167,7 +247,17 @@ class AnalyticsEvent(db.Model):
     meta = db.Column(db.JSON)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
-    user = db.relationship("User", backref="analytics_events")
+    # Deleting a user removes its events first, see users.delete_user_profile
+    user = db.relationship(
+        "User", backref=db.backref("analytics_events", passive_deletes=True)
+    )
+
+    # Keyset pagination in the admin browser orders by (timestamp, id)
+    __table_args__ = (
+        db.Index("ix_analytics_event_timestamp_id", "timestamp", "id"),
+        db.Index("ix_analytics_event_event_timestamp_id", "event", "timestamp", "id"),
+        db.Index("ix_analytics_event_user_timestamp_id", "user_id", "timestamp", "id"),
+    )
 
     def to_dict(self):
         return {
@@ -175,5 +265,79 @@ class AnalyticsEvent(db.Model):
             "user_id": self.user_id,
             "event": self.event,
             "meta": self.meta,
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self.timestamp,
         }
+
+
+class AnalyticsHourlyRollup(db.Model):
+    """Event counts per hour, maintained from AnalyticsEvent by core.rollups"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    event = db.Column(db.String(100), nullable=False)
+    bucket = db.Column(db.DateTime, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint("event", "bucket", "user_id", name="uq_hourly_rollup_key"),
+        db.Index("ix_hourly_rollup_bucket", "bucket"),
+    )
+
+
+class AnalyticsDailyRollup(db.Model):
+    """Event counts per day, maintained from AnalyticsEvent by core.rollups"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    event = db.Column(db.String(100), nullable=False)
+    bucket = db.Column(db.DateTime, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint("event", "bucket", "user_id", name="uq_daily_rollup_key"),
+        db.Index("ix_daily_rollup_bucket", "bucket"),
+    )
+
+
+class AnalyticsHourlyTotal(db.Model):
+    """Event counts per hour across all users, for dashboards (core.rollups)"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    event = db.Column(db.String(100), nullable=False)
+    bucket = db.Column(db.DateTime, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint("event", "bucket", name="uq_hourly_total_key"),
+        db.Index("ix_hourly_total_bucket", "bucket"),
+    )
+
+
+class AnalyticsDailyTotal(db.Model):
+    """Event counts per day across all users, for dashboards (core.rollups)"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    event = db.Column(db.String(100), nullable=False)
+    bucket = db.Column(db.DateTime, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint("event", "bucket", name="uq_daily_total_key"),
+        db.Index("ix_daily_total_bucket", "bucket"),
+    )
+
+
+class RollupWatermark(db.Model):
+    """Highest source row id already folded into the rollup tables"""
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime)
+
+
+class TableCounter(db.Model):
+    """Row counts kept in step with inserts/deletes, see core.counters"""
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    reconciled_at = db.Column(db.DateTime)
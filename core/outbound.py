@@ -0,0 +1,38 @@
+import os
+import threading
+
+from flask import current_app, has_app_context
+
+_state = {"pid": None, "session": None}
+_lock = threading.Lock()
+
+
+def http_session():
+    """
+    Process-wide requests.Session for outbound calls, so repeat calls to the
+    weather provider reuse keep-alive connections instead of paying a new
+    TCP and TLS handshake each time. Created lazily, and again after a fork.
+
+    Calls through it block only the calling thread, or only the calling
+    greenlet under the gevent worker (sockets are monkey-patched there).
+    """
+    session = _state["session"]
+    if session is not None and _state["pid"] == os.getpid():
+        return session
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _lock:
+        if _state["session"] is None or _state["pid"] != os.getpid():
+            pool_size = (
+                current_app.config.get("HTTP_POOL_MAXSIZE", 10)
+                if has_app_context()
+                else 10
+            )
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _state.update(pid=os.getpid(), session=session)
+        return _state["session"]
@@ -0,0 +1,107 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from flask import g, request, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_listening = False
+
+
+def init_profiling(app):
+    """
+    Opt-in per-request profiling (PROFILING_ENABLED).
+    Records wall time, SQL statement count/time and outbound HTTP time, and
+    reports them in a Server-Timing header and one JSON log line per request.
+    """
+    global _listening
+    if not app.config.get("PROFILING_ENABLED"):
+        return
+
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listening = True
+
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+
+
+def _profile():
+    if has_app_context():
+        return g.get("_profile")
+    return None
+
+
+def _start_profile():
+    g._profile = {
+        "start": time.perf_counter(),
+        "sql_count": 0,
+        "sql_time": 0.0,
+        "http_count": 0,
+        "http_time": 0.0,
+    }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_profile_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["_profile_start"].pop()
+    profile = _profile()
+    if profile is not None:
+        profile["sql_count"] += 1
+        profile["sql_time"] += time.perf_counter() - started
+
+
+@contextmanager
+def track_http():
+    """Time an outbound HTTP call against the current request's profile."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile = _profile()
+        if profile is not None:
+            profile["http_count"] += 1
+            profile["http_time"] += time.perf_counter() - started
+
+
+def _finish_profile(response):
+    profile = g.pop("_profile", None)
+    if profile is None:
+        return response
+
+    total_ms = (time.perf_counter() - profile["start"]) * 1000
+    sql_ms = profile["sql_time"] * 1000
+    http_ms = profile["http_time"] * 1000
+
+    response.headers["Server-Timing"] = ", ".join(
+        [
+            f"app;dur={total_ms:.1f}",
+            f'db;dur={sql_ms:.1f};desc="{profile["sql_count"]} queries"',
+            f'http;dur={http_ms:.1f};desc="{profile["http_count"]} calls"',
+        ]
+    )
+
+    logger.info(
+        json.dumps(
+            {
+                "method": request.method,
+                "path": request.path,
+                "endpoint": request.endpoint,
+                "status": response.status_code,
+                "duration_ms": round(total_ms, 2),
+                "sql_count": profile["sql_count"],
+                "sql_ms": round(sql_ms, 2),
+                "http_count": profile["http_count"],
+                "http_ms": round(http_ms, 2),
+            }
+        )
+    )
+    return response
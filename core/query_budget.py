@@ -0,0 +1,169 @@
+import logging
+from collections import Counter
+
+from flask import g, request, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_listening = False
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries):
+    """
+    Declare how many SQL statements a view may run per request.
+    Goes between the route decorator and the view (above @jwt_required).
+    """
+
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+
+    return decorator
+
+
+class QueryCounter:
+    """
+    Records every SQL statement run in the current app context.
+    Usable directly as a context manager, and used per request when
+    QUERY_BUDGET_MODE is set.
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def duplicates(self):
+        """
+        Identical SELECTs (same SQL and parameters) run more than once, the
+        usual sign of an N+1 or a helper being called repeatedly.
+        """
+        counts = Counter(
+            stmt
+            for stmt in self.statements
+            if stmt[0].lstrip().upper().startswith("SELECT")
+        )
+        return {stmt: n for stmt, n in counts.items() if n > 1}
+
+    def __enter__(self):
+        _listen()
+        self._previous = g.get("_query_counter")
+        g._query_counter = self
+        return self
+
+    def __exit__(self, *exc):
+        g._query_counter = self._previous
+        return False
+
+
+def _listen():
+    global _listening
+    if not _listening:
+        event.listen(Engine, "after_cursor_execute", _record_statement)
+        _listening = True
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    if not has_app_context():
+        return
+    counter = g.get("_query_counter")
+    if counter is not None:
+        counter.statements.append((statement, repr(parameters)))
+
+
+def check_budget(counter, endpoint, budget):
+    """Return a list of budget violations for one request."""
+    problems = []
+    if budget is not None and counter.count > budget:
+        problems.append(f"{endpoint} ran {counter.count} queries (budget {budget})")
+    for (statement, params), n in counter.duplicates().items():
+        problems.append(
+            f"{endpoint} ran the same statement {n} times: {statement} {params}"
+        )
+    return problems
+
+
+def init_query_budgets(app):
+    """
+    Enforce declared budgets on every request when QUERY_BUDGET_MODE is
+    "raise" (fail the request, for tests) or "log" (warn only).
+    """
+    mode = app.config.get("QUERY_BUDGET_MODE")
+    if not mode:
+        return
+
+    @app.before_request
+    def _start_query_counter():
+        _listen()
+        g._query_counter = QueryCounter()
+
+    @app.after_request
+    def _check_query_budget(response):
+        counter = g.pop("_query_counter", None)
+        view = app.view_functions.get(request.endpoint)
+        if counter is None or view is None:
+            return response
+
+        problems = check_budget(
+            counter, request.endpoint, getattr(view, "query_budget", None)
+        )
+        if problems and mode == "raise":
+            response.close()  # release a streamed body's request context
+            raise QueryBudgetExceeded("\n".join(problems))
+        for problem in problems:
+            logger.warning(problem)
+        return response
+
+
+def assert_query_budget(client, method, url, **kwargs):
+    """
+    Test helper: make a request with the Flask test client and fail if the
+    endpoint exceeds its declared budget or repeats a statement.
+    Returns the response.
+    """
+    app = client.application
+    with app.app_context():
+        adapter = app.url_map.bind("localhost")
+        endpoint, _args = adapter.match(url.split("?")[0], method=method.upper())
+        budget = getattr(app.view_functions[endpoint], "query_budget", None)
+
+    if budget is None:
+        raise QueryBudgetExceeded(f"{endpoint} has no declared query budget")
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, repr(parameters)))
+
+    event.listen(Engine, "after_cursor_execute", record)
+    try:
+        response = client.open(url, method=method.upper(), **kwargs)
+        response.get_data()  # run streamed bodies inside the window too
+        response.close()
+    finally:
+        event.remove(Engine, "after_cursor_execute", record)
+
+    counter = QueryCounter()
+    counter.statements = statements
+    problems = check_budget(counter, endpoint, budget)
+    if problems:
+        raise QueryBudgetExceeded("\n".join(problems))
+    return response
+
+
+def missing_budgets(app, blueprint_prefix="core.routes"):
+    """Endpoints defined under core/routes that have no declared budget."""
+    return sorted(
+        endpoint
+        for endpoint, view in app.view_functions.items()
+        if view.__module__.startswith(blueprint_prefix)
+        and getattr(view, "query_budget", None) is None
+    )
@@ -0,0 +1,205 @@
+import logging
+import random
+import threading
+import time
+
+from flask import current_app, g, request, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc, text
+
+logger = logging.getLogger(__name__)
+
+BIND_PREFIX = "replica_"
+STICKY_COOKIE = "db_primary"
+LAST_WRITE_NAMESPACE = "last_write"
+SAFE_METHODS = ("GET", "HEAD")
+
+
+def use_primary(view):
+    """Keep a GET view on the primary, for reads that must be fresh or that write."""
+    view.use_primary = True
+    return view
+
+
+class ReplicaSet:
+    """The replica engines, and which of them are currently usable."""
+
+    def __init__(self, engines, retry_seconds=30):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def choose(self):
+        now = time.monotonic()
+        healthy = [k for k in self.engines if self._down_until.get(k, 0) <= now]
+        return self.engines[random.choice(healthy)] if healthy else None
+
+    def mark_down(self, key, reason):
+        with self._lock:
+            if self._down_until.get(key, 0) <= time.monotonic():
+                logger.warning(
+                    "Replica %s unavailable, using the primary: %s", key, reason
+                )
+            self._down_until[key] = time.monotonic() + self.retry_seconds
+
+    def mark_up(self, key):
+        with self._lock:
+            self._down_until.pop(key, None)
+
+    def check(self):
+        """Ping every replica, updating its health. Returns a status per replica."""
+        status = {}
+        for key, engine in self.engines.items():
+            started = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                self.mark_up(key)
+                status[key] = {"ok": True}
+            except Exception as e:
+                self.mark_down(key, e)
+                status[key] = {"ok": False, "error": type(e).__name__}
+            status[key]["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return status
+
+
+class RoutingSession(Session):
+    """
+    Sends the reads of requests routed to a replica (see init_replicas) to
+    that replica. Flushes and INSERT/UPDATE/DELETE statements always go to
+    the primary, as does everything outside a request.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or self._flushing or not has_request_context():
+            return engine
+        if clause is not None and getattr(clause, "is_dml", False):
+            return engine
+
+        replica = g.get("_db_replica")
+        if replica is not None and engine is self._db.engines.get(None):
+            return replica
+        return engine
+
+
+def configure_replica_binds(app):
+    """Add SQLALCHEMY_REPLICA_URIS as binds. Must run before db.init_app."""
+    uris = app.config.get("SQLALCHEMY_REPLICA_URIS") or []
+    if not uris:
+        return
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    for i, uri in enumerate(uris):
+        binds[f"{BIND_PREFIX}{i}"] = uri
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def init_replicas(app):
+    """
+    Route GET/HEAD requests to a healthy replica, unless the view is marked
+    @use_primary or the client wrote something in the last
+    READ_YOUR_WRITES_SECONDS. Writes are tracked per JWT identity in the
+    cache, so they follow the user across devices and tabs; a short-lived
+    cookie covers anonymous writes and caches that aren't shared between
+    workers. A replica that raises a connection error is skipped for
+    REPLICA_RETRY_SECONDS, and the request that hit it is run again on the
+    primary, so the client never sees the failure.
+    """
+    from .extensions import cache, db
+
+    with app.app_context():
+        engines = {
+            key: engine
+            for key, engine in db.engines.items()
+            if key and key.startswith(BIND_PREFIX)
+        }
+    if not engines:
+        return
+
+    replicas = ReplicaSet(engines, app.config.get("REPLICA_RETRY_SECONDS", 30))
+    app.extensions["replicas"] = replicas
+    window = app.config.get("READ_YOUR_WRITES_SECONDS", 5)
+
+    for key, engine in engines.items():
+
+        def _on_error(context, key=key):
+            if context.is_disconnect or isinstance(
+                context.sqlalchemy_exception, exc.OperationalError
+            ):
+                replicas.mark_down(key, context.original_exception)
+
+        event.listen(engine, "handle_error", _on_error)
+
+    def wrote_recently():
+        if request.cookies.get(STICKY_COOKIE):
+            return True
+        identity = _token_identity()
+        if identity is None:
+            return False
+        last_write = cache.get(LAST_WRITE_NAMESPACE, identity)
+        return last_write is not None and time.time() - last_write < window
+
+    @app.before_request
+    def _route_reads():
+        if request.method not in SAFE_METHODS:
+            return
+        view = app.view_functions.get(request.endpoint)
+        if view is None or getattr(view, "use_primary", False):
+            return
+        if wrote_recently():
+            return
+        g._db_replica = replicas.choose()
+
+    @app.errorhandler(exc.DBAPIError)
+    def _retry_on_primary(e):
+        replica = g.pop("_db_replica", None)
+        if replica is None or not _is_unavailable(e):
+            raise e
+        for key, engine in replicas.engines.items():
+            if engine is replica:
+                replicas.mark_down(key, e.orig)
+        # Reads only (see _route_reads), so running the view again is safe.
+        # A response that fails while streaming has been sent already
+        db.session.rollback()
+        return app.dispatch_request()
+
+    @app.after_request
+    def _stick_to_primary(response):
+        if request.method in SAFE_METHODS + ("OPTIONS",) or response.status_code >= 400:
+            return response
+        identity = _token_identity()
+        if identity is not None:
+            cache.set(LAST_WRITE_NAMESPACE, identity, time.time(), ttl=window)
+        if identity is None or not cache.backend.shared:
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=window,
+                httponly=True,
+                secure=request.is_secure,
+                samesite="Lax",
+            )
+        return response
+
+
+def _is_unavailable(e):
+    return isinstance(e, exc.OperationalError) or e.connection_invalidated
+
+
+def _token_identity():
+    """The identity of a valid access token on the request, or None."""
+    header = request.headers.get("Authorization", "")
+    if not header.startswith("Bearer "):
+        return None
+    from flask_jwt_extended import decode_token
+
+    try:
+        return str(decode_token(header[len("Bearer ") :])["sub"])
+    except Exception:
+        return None
+
+
+def replica_health():
+    replicas = current_app.extensions.get("replicas")
+    return replicas.check() if replicas else None
@@ -0,0 +1,205 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+
+from .extensions import db
+from .functions import dialect_insert
+from .models import (
+    AnalyticsEvent,
+    AnalyticsHourlyRollup,
+    AnalyticsDailyRollup,
+    AnalyticsHourlyTotal,
+    AnalyticsDailyTotal,
+    RollupWatermark,
+)
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = "analytics_event"
+
+# Per (event, bucket, user_id), read when a query filters by user
+ROLLUPS = {
+    "hour": AnalyticsHourlyRollup,
+    "day": AnalyticsDailyRollup,
+}
+
+# Per (event, bucket) across all users, what dashboards read
+TOTALS = {
+    "hour": AnalyticsHourlyTotal,
+    "day": AnalyticsDailyTotal,
+}
+
+
+def hour_bucket(ts):
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(ts):
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rollup_analytics(batch_size=5000, settle_seconds=60):
+    """
+    Fold new AnalyticsEvent rows into the hourly and daily rollups and totals.
+
+    Rows are read in id order past the stored watermark. Each batch updates the
+    rollups and advances the watermark in the same transaction, so a crash can
+    never count a row twice. Rows younger than settle_seconds are left for the
+    next run, which keeps the watermark behind inserts that are still in flight.
+    Returns the number of events folded in.
+    """
+    watermark = db.session.get(RollupWatermark, WATERMARK)
+    if watermark is None:
+        watermark = RollupWatermark(name=WATERMARK, last_id=0)
+        db.session.add(watermark)
+        db.session.flush()
+
+    cutoff = datetime.utcnow() - timedelta(seconds=settle_seconds)
+    total = 0
+
+    while True:
+        rows = db.session.execute(
+            select(
+                AnalyticsEvent.id,
+                AnalyticsEvent.event,
+                AnalyticsEvent.user_id,
+                AnalyticsEvent.timestamp,
+            )
+            .where(AnalyticsEvent.id > watermark.last_id)
+            .order_by(AnalyticsEvent.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        hourly, daily = Counter(), Counter()
+        last_id = watermark.last_id
+        settled = True
+
+        for row in rows:
+            if row.timestamp is not None and row.timestamp > cutoff:
+                settled = False
+                break
+            last_id = row.id
+            if row.timestamp is None:
+                continue
+            hourly[(row.event, hour_bucket(row.timestamp), row.user_id)] += 1
+            daily[(row.event, day_bucket(row.timestamp), row.user_id)] += 1
+
+        if last_id == watermark.last_id:
+            break
+
+        apply_counts(hourly, daily)
+        processed = sum(daily.values())
+        watermark.last_id = last_id
+        watermark.updated_at = datetime.utcnow()
+        db.session.commit()
+
+        total += processed
+        logger.info("Rolled up %d analytics events (watermark %d)", processed, last_id)
+
+        if not settled or len(rows) < batch_size:
+            break
+
+    db.session.commit()
+    return total
+
+
+def apply_counts(hourly, daily):
+    """
+    Add per-user counts, keyed by (event, bucket, user_id), onto the hourly
+    and daily rollups and their (event, bucket) totals.
+    """
+    for counts, rollup, total in (
+        (hourly, AnalyticsHourlyRollup, AnalyticsHourlyTotal),
+        (daily, AnalyticsDailyRollup, AnalyticsDailyTotal),
+    ):
+        totals = Counter()
+        for (event, bucket, _user_id), n in counts.items():
+            totals[(event, bucket)] += n
+        increment_rollup(rollup, counts)
+        increment_rollup(total, totals)
+
+
+def _key_columns(model):
+    if "user_id" in model.__table__.c:
+        return ("event", "bucket", "user_id")
+    return ("event", "bucket")
+
+
+def increment_rollup(model, counts):
+    """
+    Add counts onto a rollup table, keyed by (event, bucket, user_id) or
+    (event, bucket) for the totals tables.
+    """
+    if not counts:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+    columns = _key_columns(model)
+    rows = [dict(zip(columns, key), count=n) for key, n in counts.items()]
+
+    if dialect in ("postgresql", "sqlite"):
+        stmt = dialect_insert(model, dialect)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(columns),
+            set_={"count": model.count + stmt.excluded.count},
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    for row in rows:
+        updated = (
+            db.session.query(model)
+            .filter_by(**{c: row[c] for c in columns})
+            .update({model.count: model.count + row["count"]})
+        )
+        if not updated:
+            db.session.add(model(**row))
+    db.session.flush()
+
+
+def _filtered(query, model, event=None, user_id=None, since=None, until=None):
+    if event:
+        query = query.where(model.event == event)
+    if user_id is not None:
+        query = query.where(model.user_id == user_id)
+    if since is not None:
+        query = query.where(model.bucket >= since)
+    if until is not None:
+        query = query.where(model.bucket < until)
+    return query
+
+
+def _source(period, user_id=None):
+    # The totals are far smaller than the per-user rows, so only a query
+    # for one user needs the per-user table
+    return ROLLUPS[period] if user_id is not None else TOTALS[period]
+
+
+def event_counts(period="day", **filters):
+    """Total events per event name, e.g. {"page_view": 1200, ...}"""
+    model = _source(period, filters.get("user_id"))
+    query = _filtered(
+        select(model.event, func.sum(model.count)).group_by(model.event),
+        model,
+        **filters,
+    )
+    return {event: int(n) for event, n in db.session.execute(query)}
+
+
+def event_timeseries(period="day", **filters):
+    """Event counts per bucket, oldest first."""
+    model = _source(period, filters.get("user_id"))
+    query = _filtered(
+        select(model.bucket, func.sum(model.count))
+        .group_by(model.bucket)
+        .order_by(model.bucket),
+        model,
+        **filters,
+    )
+    return [
+        {"bucket": bucket, "count": int(n)} for bucket, n in db.session.execute(query)
+    ]
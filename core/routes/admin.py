@@ -1,59 +1,304 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import (
+    Blueprint,
+    jsonify,
+    request,
+    current_app,
+    Response,
+    stream_with_context,
+)
+from flask_jwt_extended import jwt_required, current_user
 from ..models import User, AnalyticsEvent, UserDailyRecord, Leads
-from ..extensions import db
-
+from ..extensions import db, analytics_buffer, cache
+from ..rollups import ROLLUPS, event_counts, event_timeseries
+from ..counters import get_counts
+from ..query_budget import query_budget
+from ..slow_queries import top_slow_queries
+from sqlalchemy import tuple_, select, func
+from datetime import datetime
+import base64, binascii, csv, io
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin")
 
 
 @admin_bp.route("/", methods=["GET"])
+@query_budget(5)
 @jwt_required()
 def get_admin_overview():
-    current_user = get_jwt_identity()
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_user
 
     if not user or not user.is_admin:
         return jsonify({"error": "Unauthorized"}), 403
 
-    user_count = User.query.count()
-    record_count = UserDailyRecord.query.count()
-    lead_count = Leads.query.count()
+    approximate = request.args.get(
+        "approximate", current_app.config.get("ADMIN_COUNTS_APPROXIMATE", False)
+    ) in (True, "1", "true")
+    counts = get_counts(approximate=approximate)
 
     return (
-        jsonify({"users": user_count, "records": record_count, "leads": lead_count}),
+        jsonify(
+            {
+                "users": counts["user"],
+                "records": counts["user_daily_record"],
+                "leads": counts["leads"],
+            }
+        ),
         200,
     )
 
 
 @admin_bp.route("/analytics", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 def get_analytics_view():
-    current_user = get_jwt_identity()
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    """
+    Browse raw analytics events, newest first.
+    Filters: ?event=&user_id=&since=&until=. Pagination: ?limit= and ?cursor=,
+    where the cursor for the next page is returned in the X-Next-Cursor header.
+    ?fields=a,b limits each event's meta to those keys.
+    """
+    user = current_user
 
     if not user or not user.is_admin:
         return jsonify({"error": "Unauthorized"}), 403
 
+    try:
+        filters = _rollup_filters()
+        cursor = _decode_cursor(request.args.get("cursor"))
+    except ValueError:
+        return jsonify({"error": "Invalid date or cursor"}), 400
+
+    limit = max(1, min(request.args.get("limit", 100, type=int), 1000))
+    fields = [f for f in request.args.get("fields", "").split(",") if f]
+
+    query = AnalyticsEvent.query.filter(AnalyticsEvent.timestamp.isnot(None))
+    if filters["event"]:
+        query = query.filter(AnalyticsEvent.event == filters["event"])
+    if filters["user_id"] is not None:
+        query = query.filter(AnalyticsEvent.user_id == filters["user_id"])
+    if filters["since"]:
+        query = query.filter(AnalyticsEvent.timestamp >= filters["since"])
+    if filters["until"]:
+        query = query.filter(AnalyticsEvent.timestamp < filters["until"])
+    if cursor:
+        query = query.filter(
+            tuple_(AnalyticsEvent.timestamp, AnalyticsEvent.id) < cursor
+        )
+
     events = (
-        AnalyticsEvent.query.order_by(AnalyticsEvent.timestamp.desc()).limit(100).all()
+        query.order_by(AnalyticsEvent.timestamp.desc(), AnalyticsEvent.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+    results = []
+    for e in events:
+        data = e.to_dict()
+        if fields:
+            meta = e.meta or {}
+            data["meta"] = {k: meta.get(k) for k in fields}
+        results.append(data)
+
+    response = jsonify(results)
+    if len(events) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(
+            events[-1].timestamp, events[-1].id
+        )
+    return response
+
+
+def _encode_cursor(timestamp, id):
+    raw = f"{timestamp.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        timestamp, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(id)
+    except (TypeError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(str(e))
+
+
+def _rollup_filters():
+    """Parse ?event=&user_id=&since=&until= (ISO dates or datetimes)."""
+    filters = {
+        "event": request.args.get("event"),
+        "user_id": request.args.get("user_id", type=int),
+    }
+    for key in ("since", "until"):
+        value = request.args.get(key)
+        filters[key] = datetime.fromisoformat(value) if value else None
+    return filters
+
+
+@admin_bp.route("/analytics/counts", methods=["GET"])
+@query_budget(2)
+@jwt_required()
+def get_analytics_counts():
+    user = current_user
+
+    if not user or not user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    period = request.args.get("period", "day")
+    if period not in ROLLUPS:
+        return jsonify({"error": "period must be 'hour' or 'day'"}), 400
+
+    try:
+        filters = _rollup_filters()
+    except ValueError:
+        return jsonify({"error": "Invalid date format"}), 400
+
+    return jsonify(event_counts(period, **filters)), 200
+
+
+@admin_bp.route("/analytics/timeseries", methods=["GET"])
+@query_budget(2)
+@jwt_required()
+def get_analytics_timeseries():
+    user = current_user
+
+    if not user or not user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    period = request.args.get("period", "day")
+    if period not in ROLLUPS:
+        return jsonify({"error": "period must be 'hour' or 'day'"}), 400
+
+    try:
+        filters = _rollup_filters()
+    except ValueError:
+        return jsonify({"error": "Invalid date format"}), 400
+
+    return jsonify(event_timeseries(period, **filters)), 200
+
+
+@admin_bp.route("/slow-queries", methods=["GET"])
+@query_budget(1)
+@jwt_required()
+def get_slow_queries():
+    """Top-N slowest statement fingerprints seen by this worker (?limit=&sort=)."""
+    user = current_user
+
+    if not user or not user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    sort = request.args.get("sort", "total_ms")
+    if sort not in ("total_ms", "max_ms", "count"):
+        return jsonify({"error": "sort must be total_ms, max_ms or count"}), 400
+
+    limit = max(1, min(request.args.get("limit", 20, type=int), 500))
+    return jsonify(top_slow_queries(limit=limit, sort=sort)), 200
+
+
+@admin_bp.route("/analytics/buffer", methods=["GET"])
+@query_budget(1)
+@jwt_required()
+def get_analytics_buffer_stats():
+    user = current_user
+
+    if not user or not user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    return jsonify(analytics_buffer.stats()), 200
+
+
+@admin_bp.route("/cache", methods=["GET"])
+@query_budget(1)
+@jwt_required()
+def get_cache_stats():
+    user = current_user
+
+    if not user or not user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    return jsonify(cache.stats()), 200
+
+
+@admin_bp.route("/cache/<namespace>", methods=["DELETE"])
+@query_budget(1)
+@jwt_required()
+def invalidate_cache(namespace):
+    user = current_user
+
+    if not user or not user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    return (
+        jsonify({"namespace": namespace, "removed": cache.invalidate(namespace)}),
+        200,
+    )
+
+
+def _email_prefix_filter(column, q):
+    """Case-insensitive email prefix match, served by the lower(email) index."""
+    escaped = q.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return func.lower(column).like(escaped + "%", escape="\\")
+
+
+def _paginate_by_id(query, model):
+    """Apply ?q= (email prefix), ?cursor= (last id seen) and ?limit= to a query."""
+    q = request.args.get("q", "").strip()
+    cursor = request.args.get("cursor", type=int)
+    limit = max(1, min(request.args.get("limit", 100, type=int), 1000))
+
+    if q:
+        query = query.filter(_email_prefix_filter(model.email, q))
+    if cursor:
+        query = query.filter(model.id < cursor)
+    return query.order_by(model.id.desc()).limit(limit).all(), limit
+
+
+def _with_next_cursor(response, items, limit):
+    if len(items) == limit:
+        response.headers["X-Next-Cursor"] = str(items[-1].id)
+    return response
+
+
+# Spreadsheet apps run cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _stream_csv(filename, header, rows):
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        for i, row in enumerate(rows, 1):
+            writer.writerow([_csv_cell(value) for value in row])
+            if i % 1000 == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
-    return jsonify([e.to_dict() for e in events])
 
 
 @admin_bp.route("/users", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 def get_all_users():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    """Users, newest first. Supports ?q= email prefix, ?limit= and ?cursor=."""
+    user = current_user
 
     if not user or not user.is_admin:
         return jsonify({"error": "Unauthorized"}), 403
 
-    users = User.query.order_by(User.id.desc()).all()
-    return jsonify(
+    users, limit = _paginate_by_id(User.query, User)
+    response = jsonify(
         [
             {
                 "id": u.id,
@@ -63,26 +308,63 @@ def get_all_users():
             for u in users
         ]
     )
+    return _with_next_cursor(response, users, limit)
+
+
+@admin_bp.route("/users/export.csv", methods=["GET"])
+@query_budget(2)
+@jwt_required()
+def export_users():
+    user = current_user
+
+    if not user or not user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    rows = db.session.execute(
+        select(User.id, User.email, User.name, User.is_admin)
+        .order_by(User.id)
+        .execution_options(yield_per=1000)
+    )
+    return _stream_csv("users.csv", ["id", "email", "name", "is_admin"], rows)
 
 
 @admin_bp.route("/leads", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 def get_all_leads():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    """Leads, newest first. Supports ?q= email prefix, ?limit= and ?cursor=."""
+    user = current_user
 
     if not user or not user.is_admin:
         return jsonify({"error": "Unauthorized"}), 403
 
-    leads = Leads.query.order_by(Leads.id.desc()).all()
-    return jsonify(
+    leads, limit = _paginate_by_id(Leads.query, Leads)
+    response = jsonify(
         [
             {
                 "id": l.id,
                 "email": l.email,
                 "name": l.name,
-                "timestamp": l.timestamp.isoformat() if l.timestamp else None,
+                "timestamp": l.timestamp,
             }
             for l in leads
         ]
     )
+    return _with_next_cursor(response, leads, limit)
+
+
+@admin_bp.route("/leads/export.csv", methods=["GET"])
+@query_budget(2)
+@jwt_required()
+def export_leads():
+    user = current_user
+
+    if not user or not user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    rows = db.session.execute(
+        select(Leads.id, Leads.email, Leads.name, Leads.timestamp)
+        .order_by(Leads.id)
+        .execution_options(yield_per=1000)
+    )
+    return _stream_csv("leads.csv", ["id", "email", "name", "timestamp"], rows)
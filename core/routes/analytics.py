@@ -1,28 +1,121 @@
-from flask import Blueprint, request, jsonify
-from ..models import AnalyticsEvent  # create this model
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-from ..extensions import db
+from sqlalchemy import insert
+import json
+
+from ..models import AnalyticsEvent
+from ..extensions import db, analytics_buffer
+from ..query_budget import query_budget
 
 analytics_bp = Blueprint("analytics", __name__, url_prefix="/api/analytics")
 
 
 @analytics_bp.route("/", methods=["POST"])
+@query_budget(2)
 @jwt_required()
 def log_event():
-    data = request.get_json()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Body must be a JSON object"}), 400
     event = data.get("event")
     meta = data.get("meta", {})
     user_id = get_jwt_identity()
 
-    if not event:
-        return jsonify({"error": "Missing event"}), 400
+    # Checked up front: the row is written later, in a batch with others
+    error = _event_error(event, meta)
+    if error:
+        return jsonify({"error": error}), 400
 
-    db.session.add(
-        AnalyticsEvent(
-            user_id=user_id, event=event, meta=meta, timestamp=datetime.utcnow()
-        )
+    # Written asynchronously in batches, see core/analytics_buffer.py
+    analytics_buffer.add(
+        {
+            "user_id": int(user_id),
+            "event": event,
+            "meta": meta,
+            "timestamp": datetime.utcnow(),
+        }
     )
+
+    return jsonify({"message": "Event accepted"}), 202
+
+
+@analytics_bp.route("/batch", methods=["POST"])
+@query_budget(2)
+@jwt_required()
+def log_events_batch():
+    """
+    Log several events in one request.
+    Accepts a JSON array of {"event": ..., "meta": {...}} objects, or the same
+    objects as NDJSON (one per line, Content-Type: application/x-ndjson).
+    The whole batch is validated first and inserted in a single statement.
+    """
+    try:
+        items = _parse_batch_body()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    max_events = current_app.config.get("ANALYTICS_BATCH_MAX_EVENTS", 500)
+    if not items:
+        return jsonify({"error": "No events provided"}), 400
+    if len(items) > max_events:
+        return jsonify({"error": f"Too many events (max {max_events})"}), 413
+
+    user_id = int(get_jwt_identity())
+    now = datetime.utcnow()
+    rows, errors = [], []
+
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({"index": i, "error": "Event must be an object"})
+            continue
+
+        event = item.get("event")
+        meta = item.get("meta", {})
+        error = _event_error(event, meta)
+        if error:
+            errors.append({"index": i, "error": error})
+        else:
+            rows.append(
+                {"user_id": user_id, "event": event, "meta": meta, "timestamp": now}
+            )
+
+    if errors:
+        return jsonify({"error": "Invalid events", "details": errors}), 400
+
+    db.session.execute(insert(AnalyticsEvent), rows)
     db.session.commit()
 
-    return jsonify({"message": "Event logged"}), 201
+    return jsonify({"message": "Events logged", "count": len(rows)}), 201
+
+
+def _event_error(event, meta):
+    if not event or not isinstance(event, str):
+        return "Missing event"
+    if len(event) > 100:
+        return "Event name too long"
+    if meta is not None and not isinstance(meta, dict):
+        return "meta must be an object"
+    return None
+
+
+def _parse_batch_body():
+    if request.mimetype in ("application/x-ndjson", "application/jsonlines"):
+        items = []
+        for n, line in enumerate(request.get_data(as_text=True).splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                raise ValueError(f"Invalid JSON on line {n}")
+        return items
+
+    data = request.get_json(silent=True)
+    if data is None:
+        raise ValueError("Body must be a JSON array or NDJSON")
+    if isinstance(data, dict):
+        data = data.get("events")
+    if not isinstance(data, list):
+        raise ValueError("Body must be a JSON array or NDJSON")
+    return data
@@ -4,10 +4,12 @@ from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identi
 
 from core.extensions import db
 from core.models import User
-
-from authlib.integrations.flask_client import OAuth
+from core.profiling import track_http
+from core.query_budget import query_budget
+from core.replicas import use_primary
 
 import os
+import threading
 
 auth = Blueprint("auth", __name__, url_prefix="/api/auth")
 
@@ -21,28 +23,50 @@ Endpoints defined here are responsible for:
 These endpoints are essential for managing user sessions and securing access to the application.
 """
 
-oauth = OAuth()
-oauth.register(
-    name="google",
-    client_id=os.getenv("GOOGLE_CLIENT_ID"),
-    client_secret=os.getenv("GOOGLE_CLIENT_SECRET"),
-    authorize_url="https://accounts.google.com/o/oauth2/v2/auth",
-    access_token_url="https://oauth2.googleapis.com/token",
-    api_base_url="https://www.googleapis.com/oauth2/v2/",
-    userinfo_endpoint="https://www.googleapis.com/oauth2/v2/userinfo",
-    client_kwargs={
-        "scope": "email profile",  # 🔥 REMOVE openid
-        "token_endpoint_auth_method": "client_secret_post",
-    },
-)
+_oauth_lock = threading.Lock()
+
+
+def init_oauth(app):
+    """Google OAuth settings for this app. Authlib is only imported on first use."""
+    app.config.setdefault("GOOGLE_CLIENT_ID", os.getenv("GOOGLE_CLIENT_ID"))
+    app.config.setdefault("GOOGLE_CLIENT_SECRET", os.getenv("GOOGLE_CLIENT_SECRET"))
+
+
+def google_client():
+    app = current_app._get_current_object()
+    oauth = app.extensions.get("oauth")
+    if oauth is None:
+        with _oauth_lock:
+            oauth = app.extensions.get("oauth")
+            if oauth is None:
+                from authlib.integrations.flask_client import OAuth
+
+                oauth = OAuth(app)
+                oauth.register(
+                    name="google",
+                    client_id=app.config["GOOGLE_CLIENT_ID"],
+                    client_secret=app.config["GOOGLE_CLIENT_SECRET"],
+                    authorize_url="https://accounts.google.com/o/oauth2/v2/auth",
+                    access_token_url="https://oauth2.googleapis.com/token",
+                    api_base_url="https://www.googleapis.com/oauth2/v2/",
+                    userinfo_endpoint="https://www.googleapis.com/oauth2/v2/userinfo",
+                    client_kwargs={
+                        "scope": "email profile",  # 🔥 REMOVE openid
+                        "token_endpoint_auth_method": "client_secret_post",
+                    },
+                )
+                app.extensions["oauth"] = oauth
+    return oauth.google
 
 
 @auth.route("/", methods=["GET"])
+@query_budget(0)
 def auth_status():
     return jsonify({"endpoint": "auth"}), 200
 
 
 @auth.route("/register", methods=["POST"])
+@query_budget(2)
 def register():
     data = request.get_json()
     if not data:
@@ -64,6 +88,7 @@ def register():
 
 
 @auth.route("/login", methods=["POST"])
+@query_budget(1)
 def login():
     data = request.get_json()
     if not data:
@@ -81,22 +106,27 @@ def login():
 
 
 @auth.route("/login/google")
+@query_budget(0)
 def login_google():
     redirect_uri = url_for("auth.google_callback", _external=True)
-    return oauth.google.authorize_redirect(redirect_uri)
+    return google_client().authorize_redirect(redirect_uri)
 
 
 @auth.route("/callback/google")
+@query_budget(3)
+@use_primary
 def google_callback():
     try:
-        token = oauth.google.authorize_access_token()
+        with track_http():
+            token = google_client().authorize_access_token()
         print("✅ Token received:", token)
     except Exception as e:
         print("❌ Token exchange failed:", e)
         return jsonify({"error": "Token exchange failed", "details": str(e)}), 400
 
     try:
-        resp = oauth.google.get("userinfo")
+        with track_http():
+            resp = google_client().get("userinfo")
         print("📥 Userinfo response status:", resp.status_code)
         print("📥 Userinfo response text:", resp.text)
         user_info = resp.json()
@@ -107,10 +137,6 @@ def google_callback():
             400,
         )  # 🔥 Don't call `parse_id_token(token)` anywhere
 
-    # FIX: Only do this
-    resp = oauth.google.get("userinfo")
-    user_info = resp.json()
-
     email = user_info.get("email")
     name = user_info.get("name", "Google User")
 
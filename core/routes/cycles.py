@@ -9,32 +9,38 @@ from datetime import date, datetime
 
 from core.extensions import db
 from core.models import UserDailyRecord, UserCycleEvent
+from core.query_budget import query_budget
 
 cycles = Blueprint("cycles", __name__, url_prefix="/api/cycles")
 
 
 @cycles.route("/", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 def get_all_cycles():
     """Get all cycle events for the current user."""
-    records = UserDailyRecord.query.filter_by(user_id=current_user.id).all()
-    events = []
-
-    for record in records:
-        for event in record.cycle_events:
-            events.append(
-                {
-                    "date": record.date.isoformat(),
-                    "event_type": event.event_type,
-                    "start_time": event.start_time.strftime("%H:%M:%S"),
-                    "end_time": event.end_time.strftime("%H:%M:%S"),
-                }
-            )
+    rows = (
+        db.session.query(UserDailyRecord.date, UserCycleEvent)
+        .join(UserCycleEvent, UserCycleEvent.user_daily_record_id == UserDailyRecord.id)
+        .filter(UserDailyRecord.user_id == current_user.id)
+        .order_by(UserDailyRecord.date, UserCycleEvent.start_time)
+        .all()
+    )
+    events = [
+        {
+            "date": record_date.isoformat(),
+            "event_type": event.event_type,
+            "start_time": event.start_time.strftime("%H:%M:%S"),
+            "end_time": event.end_time.strftime("%H:%M:%S"),
+        }
+        for record_date, event in rows
+    ]
 
     return jsonify(events), 200
 
 
 @cycles.route("/today", methods=["GET"])
+@query_budget(3)
 @jwt_required()
 def get_todays_cycles():
     """Get today's cycle events for the current user."""
@@ -52,7 +58,7 @@ def get_todays_cycles():
             "start_time": event.start_time.strftime("%H:%M:%S"),
             "end_time": event.end_time.strftime("%H:%M:%S"),
         }
-        for event in record.cycle_events
+        for event in record.events
     ]
     wake_time = record.wake_time.strftime("%H:%M:%S") if record.wake_time else None
 
@@ -63,6 +69,7 @@ def get_todays_cycles():
 
 
 @cycles.route("/", methods=["POST"])
+@query_budget(3)
 @jwt_required()
 def add_cycle_event():
     """Add a new cycle event to today’s record."""
@@ -100,6 +107,7 @@ def add_cycle_event():
 
 
 @cycles.route("/<int:event_id>", methods=["PUT"])
+@query_budget(4)
 @jwt_required()
 def update_cycle_event(event_id):
     data = request.get_json()
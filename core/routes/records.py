@@ -6,12 +6,14 @@ from flask_jwt_extended import (
     current_user,
 )
 from datetime import datetime, date
-from ..models import db, UserDailyRecord
+from ..models import db, User, UserDailyRecord
+from ..query_budget import query_budget
 
 records = Blueprint("records", __name__, url_prefix="/api/records")
 
 
 @records.route("/", methods=["GET"], endpoint="get_today_record")
+@query_budget(2)
 @jwt_required()
 def get_today_record():
     today = date.today()
@@ -25,6 +27,7 @@ def get_today_record():
 
 
 @records.route("/all", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 def get_all_records():
     user_id = current_user.id
@@ -38,6 +41,7 @@ def get_all_records():
 
 
 @records.route("/", methods=["POST", "OPTIONS"], endpoint="create_or_update_record")
+@query_budget(4)
 @jwt_required()
 def create_or_update_record():
     if request.method == "OPTIONS":
@@ -67,12 +71,18 @@ def create_or_update_record():
     record.mood = data.get("mood")  # Can be emoji
 
     db.session.add(record)
+    # After the commit, or a concurrent request could cache the old baseline
+    # again. Read the id first, the commit expires current_user
+    user_id = current_user.id
     db.session.commit()
+    User.clear_baselines_for(user_id)
+    User.clear_wake_time_for(user_id, today)
 
     return jsonify({"message": "Record saved"}), 200
 
 
 @records.route("/today", methods=["GET"], endpoint="get_today_record_explicit")
+@query_budget(2)
 @jwt_required()
 def get_today_record_explicit():
     today = date.today()
@@ -86,6 +96,7 @@ def get_today_record_explicit():
 
 
 @records.route("/<int:record_id>/", methods=["PUT", "OPTIONS"])
+@query_budget(3)
 @jwt_required()
 def update_record(record_id):
     if request.method == "OPTIONS":
@@ -111,11 +122,15 @@ def update_record(record_id):
         if field in data:
             setattr(record, field, data[field])
 
+    user_id, day = current_user.id, record.date
     db.session.commit()
+    User.clear_baselines_for(user_id)
+    User.clear_wake_time_for(user_id, day)
     return jsonify({"message": "Record updated"}), 200
 
 
 @records.route("/records/<int:record_id>", methods=["PUT"])
+@query_budget(3)
 @jwt_required()
 def end_daily_record(record_id):
     record = UserDailyRecord.query.get(record_id)
@@ -7,14 +7,18 @@ from flask_jwt_extended import (
 )
 from datetime import date, datetime
 
+from sqlalchemy import insert
+
 from core.extensions import db
 from core.functions import generate_ultradian_cycles
 from core.models import UserDailyRecord, UserCycleEvent
+from core.query_budget import query_budget
 
 ultradian = Blueprint("ultradian", __name__, url_prefix="/api/ultradian")
 
 
 @ultradian.route("/", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 def get_ultradian_cycles():
     """
@@ -32,15 +36,11 @@ def get_ultradian_cycles():
 
     user = current_user
 
-    # Fetch daily record
-    record = UserDailyRecord.query.filter_by(
-        user_id=user.id, date=ultradian_date
-    ).first()
-    if not record or not record.wake_time:
+    # Cached, see User.get_wake_time
+    wake_time = user.get_wake_time(ultradian_date)
+    if not wake_time:
         return jsonify({"message": "No ultradian data exists for this date"}), 204
 
-    wake_time = record.wake_time.strftime("%H:%M:%S")
-
     # Use user defaults unless overridden
     peak = int(request.args.get("peak", user.peak_duration))
     trough = int(request.args.get("trough", user.trough_duration))
@@ -55,6 +55,7 @@ def get_ultradian_cycles():
 
 
 @ultradian.route("/", methods=["POST", "OPTIONS"])
+@query_budget(4)
 @jwt_required()
 def ultradian_cycles():
     today = request.json.get("date", date.today())
@@ -81,27 +82,24 @@ def ultradian_cycles():
         # Clear existing events for today (optional safety step)
         UserCycleEvent.query.filter_by(user_daily_record_id=record.id).delete()
 
+        # One multi-row INSERT instead of one statement per event
+        rows = []
         for cycle in cycles:
-            db.session.add(
-                UserCycleEvent(
-                    user_daily_record_id=record.id,
-                    event_type="peak",
-                    start_time=datetime.strptime(
-                        cycle["peak_start"], "%H:%M:%S"
-                    ).time(),
-                    end_time=datetime.strptime(cycle["peak_end"], "%H:%M:%S").time(),
-                )
-            )
-            db.session.add(
-                UserCycleEvent(
-                    user_daily_record_id=record.id,
-                    event_type="trough",
-                    start_time=datetime.strptime(
-                        cycle["trough_start"], "%H:%M:%S"
-                    ).time(),
-                    end_time=datetime.strptime(cycle["trough_end"], "%H:%M:%S").time(),
+            for event_type in ("peak", "trough"):
+                rows.append(
+                    {
+                        "user_daily_record_id": record.id,
+                        "event_type": event_type,
+                        "start_time": datetime.strptime(
+                            cycle[f"{event_type}_start"], "%H:%M:%S"
+                        ).time(),
+                        "end_time": datetime.strptime(
+                            cycle[f"{event_type}_end"], "%H:%M:%S"
+                        ).time(),
+                    }
                 )
-            )
+        if rows:
+            db.session.execute(insert(UserCycleEvent), rows)
 
         db.session.commit()
 
@@ -6,8 +6,9 @@ from flask_jwt_extended import (
     current_user,
 )
 
-from ..models import User
+from ..models import User, UserDailyRecord, UserCycleEvent, AnalyticsEvent
 from ..extensions import db
+from ..query_budget import query_budget
 
 users = Blueprint("users", __name__, url_prefix="/api/users")
 """
@@ -21,6 +22,7 @@ These endpoints are essential for managing user information and preferences.
 
 
 @users.route("/me", methods=["GET"])
+@query_budget(1)
 @jwt_required()
 def get_user_profile():
     """
@@ -54,6 +56,7 @@ def get_user_profile():
 
 
 @users.route("/<user_id>", methods=["GET"])
+@query_budget(1)
 def get_user_profile_by_id(user_id):
     """
     Retrieve a user profile by user ID.
@@ -77,6 +80,7 @@ def get_user_profile_by_id(user_id):
 
 
 @users.route("/me", methods=["PUT"])
+@query_budget(2)
 @jwt_required()
 def update_user_profile():
     """
@@ -105,6 +109,7 @@ def update_user_profile():
 
 
 @users.route("/me", methods=["DELETE"])
+@query_budget(7)
 @jwt_required()
 def delete_user_profile():
     """
@@ -115,12 +120,21 @@ def delete_user_profile():
     if not user:
         return jsonify({"error": "User not found"}), 404
 
+    # The user's rows reference it with NOT NULL foreign keys, remove them first
+    record_ids = db.select(UserDailyRecord.id).where(UserDailyRecord.user_id == user.id)
+    UserCycleEvent.query.filter(
+        UserCycleEvent.user_daily_record_id.in_(record_ids)
+    ).delete(synchronize_session=False)
+    UserDailyRecord.query.filter_by(user_id=user.id).delete(synchronize_session=False)
+    AnalyticsEvent.query.filter_by(user_id=user.id).delete(synchronize_session=False)
+
     db.session.delete(user)
     db.session.commit()
     return jsonify({"message": "User profile deleted successfully"}), 200
 
 
 @users.route("/<int:user_id>", methods=["PUT"])
+@query_budget(2)
 @jwt_required()
 def update_user(user_id):
     user = User.query.get(user_id)
@@ -6,11 +6,13 @@ from flask_jwt_extended import (
     current_user,
 )
 from utils.weather import get_weather_data
+from ..query_budget import query_budget
 
 vibe_bp = Blueprint("vibe", __name__, url_prefix="/api")
 
 
 @vibe_bp.route("/vibe-score/", methods=["GET"])
+@query_budget(4)
 @jwt_required()
 def get_vibe_score():
     penalties = []
@@ -22,9 +24,10 @@ def get_vibe_score():
     weather = get_weather_data(lat, lon) or {}
 
     # --- User Data ---
-    hrv = current_user.latest_hrv or 60
-    rhr = current_user.latest_rhr or 55
-    sleep = current_user.last_sleep_duration or 7.5
+    latest = current_user.latest_record()
+    hrv = (latest.hrv if latest else None) or 60
+    rhr = (latest.rhr if latest else None) or 55
+    sleep = (latest.sleep_duration if latest else None) or 7.5
     mood = request.args.get("mood", "")  # e.g. 😐
 
     baseline_values = {
@@ -5,11 +5,13 @@ from flask_jwt_extended import (
     get_jwt_identity,
     current_user,
 )
+from ..query_budget import query_budget
 
 vital = Blueprint("vital", __name__, url_prefix="/api/energy-potential")
 
 
 @vital.route("/", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 def get_energy_potential():
     result = current_user.calculate_vital_index()
@@ -0,0 +1,305 @@
+import csv
+import io
+import json
+import logging
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, select, func, text
+from werkzeug.security import generate_password_hash
+
+from .counters import increment
+from .extensions import db
+from .models import User, UserDailyRecord, UserCycleEvent, AnalyticsEvent, Leads
+
+logger = logging.getLogger(__name__)
+
+SEED_PASSWORD = "password"
+
+MOODS = ["🙂", "😐", "😴", "😄", "😣"]
+MOOD_WEIGHTS = [40, 25, 15, 12, 8]
+
+# event name -> relative frequency
+EVENTS = {
+    "page_view": 50,
+    "click": 25,
+    "record_saved": 8,
+    "cycles_generated": 5,
+    "vibe_score_viewed": 10,
+    "settings_changed": 2,
+}
+PAGES = ["/dashboard", "/records", "/cycles", "/vibe", "/settings"]
+
+FIRST_NAMES = [
+    "Alex",
+    "Sam",
+    "Jordan",
+    "Taylor",
+    "Casey",
+    "Riley",
+    "Jamie",
+    "Morgan",
+    "Drew",
+    "Quinn",
+]
+
+
+class _Inserter:
+    """
+    Writes row dicts for one table in batches: PostgreSQL COPY when the
+    connection is psycopg2, otherwise executemany Core inserts. Parent
+    inserters are flushed first so foreign keys always resolve.
+    """
+
+    def __init__(self, connection, model, batch_size, parents=()):
+        self.connection = connection
+        self.parents = parents
+        self.table = model.__table__
+        self.batch_size = batch_size
+        self.rows = []
+        self.total = 0
+        self.copy = connection.dialect.driver == "psycopg2"
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        for parent in self.parents:
+            parent.flush()
+        if self.copy:
+            self._copy(self.rows)
+        else:
+            self.connection.execute(insert(self.table), self.rows)
+        self.total += len(self.rows)
+        self.rows = []
+
+    def _copy(self, rows):
+        columns = list(rows[0])
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow(
+                [json.dumps(v) if isinstance(v, dict) else v for v in row.values()]
+            )
+        buf.seek(0)
+
+        quote = self.connection.dialect.identifier_preparer.quote
+        sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+            quote(self.table.name), ", ".join(quote(c) for c in columns)
+        )
+        # The raw DBAPI connection behind this Connection, so COPY runs in the
+        # same transaction as everything else.
+        cursor = self.connection.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(sql, buf)
+        finally:
+            cursor.close()
+
+
+def _next_id(connection, model):
+    return (connection.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+def _user_profile(rng):
+    """Per-user baselines, so each user's days vary around their own normal."""
+    return {
+        "hrv": _clamp(rng.gauss(62, 15), 20, 130),
+        "rhr": _clamp(rng.gauss(58, 6), 40, 85),
+        "sleep": _clamp(rng.gauss(7.2, 0.6), 5, 9.5),
+        "wake": _clamp(rng.gauss(6.8, 0.7), 4.5, 10),  # hours after midnight
+        "activity": rng.lognormvariate(math.log(15), 0.6),  # analytics events/day
+    }
+
+
+def _daily_values(rng, profile, day):
+    weekend = day.weekday() >= 5
+    sleep = _clamp(rng.gauss(profile["sleep"] + (0.6 if weekend else 0), 0.8), 3, 11.5)
+    deficit = profile["sleep"] - sleep
+    # A short night shows up as lower HRV and a higher resting heart rate
+    hrv = _clamp(rng.gauss(profile["hrv"] - 4 * deficit, 7), 15, 150)
+    rhr = _clamp(rng.gauss(profile["rhr"] + 1.5 * deficit, 2.5), 38, 95)
+    wake_hours = _clamp(
+        rng.gauss(profile["wake"] + (0.9 if weekend else 0), 0.35), 4, 11.5
+    )
+    wake = datetime.combine(day, datetime.min.time()) + timedelta(
+        minutes=round(wake_hours * 60)
+    )
+    return {
+        "hrv": round(hrv),
+        "rhr": round(rhr),
+        "sleep_duration": round(sleep, 2),
+        "wake": wake,
+    }
+
+
+def _poisson(rng, lam):
+    # Knuth for small means, normal approximation beyond that
+    if lam > 30:
+        return max(0, round(rng.gauss(lam, math.sqrt(lam))))
+    limit, k, p = math.exp(-lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def generate(users, days, leads=0, seed=0, batch_size=5000, end_date=None):
+    """
+    Insert `users` synthetic users with `days` daily records each (ending at
+    end_date, default today), their ultradian cycle events and analytics
+    events, plus `leads` leads. The same arguments always produce the same
+    data, except that event and lead timestamps that would be in the future
+    are set to now. Every seeded user can log in with SEED_PASSWORD.
+    Returns the number of rows inserted per table.
+    """
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=days - 1)
+    password_hash = generate_password_hash(SEED_PASSWORD)
+    event_names, event_weights = list(EVENTS), list(EVENTS.values())
+    started = time.perf_counter()
+    # The models' timestamp defaults: analytics events are UTC, leads local
+    now_utc, now_local = datetime.utcnow(), datetime.now()
+
+    connection = db.session.connection()
+    # Ids are assigned here rather than returned by the database, so child
+    # rows can reference their parents without a round trip per row.
+    user_id = _next_id(connection, User)
+    record_id = _next_id(connection, UserDailyRecord)
+    first_user_id = user_id
+
+    users_in = _Inserter(connection, User, batch_size)
+    records_in = _Inserter(connection, UserDailyRecord, batch_size, [users_in])
+    inserters = {
+        User: users_in,
+        UserDailyRecord: records_in,
+        UserCycleEvent: _Inserter(connection, UserCycleEvent, batch_size, [records_in]),
+        AnalyticsEvent: _Inserter(connection, AnalyticsEvent, batch_size, [users_in]),
+        Leads: _Inserter(connection, Leads, batch_size),
+    }
+
+    for _ in range(users):
+        profile = _user_profile(rng)
+        peak = rng.choice([80, 90, 90, 90, 100])
+        trough = rng.choice([15, 20, 20, 25])
+        grog = rng.choice([15, 20, 30, 30, 45])
+        cycles = rng.choice([3, 4, 5, 5, 6])
+        inserters[User].add(
+            {
+                "id": user_id,
+                "email": f"user{user_id}@example.com",
+                "password_hash": password_hash,
+                "name": f"{rng.choice(FIRST_NAMES)} {user_id}",
+                "peak_duration": peak,
+                "trough_duration": trough,
+                "morning_grog": grog,
+                "cycles": cycles,
+                "is_admin": False,
+            }
+        )
+
+        for d in range(days):
+            day = start_date + timedelta(days=d)
+            values = _daily_values(rng, profile, day)
+            wake = values.pop("wake")
+            inserters[UserDailyRecord].add(
+                {
+                    "id": record_id,
+                    "user_id": user_id,
+                    "date": day,
+                    "wake_time": wake.time(),
+                    "mood": rng.choices(MOODS, MOOD_WEIGHTS)[0],
+                    "ended_at": None if day == end_date else wake + timedelta(hours=16),
+                    **values,
+                }
+            )
+
+            cursor = wake + timedelta(minutes=grog)
+            for _ in range(cycles):
+                peak_end = cursor + timedelta(minutes=peak)
+                trough_end = peak_end + timedelta(minutes=trough)
+                for event_type, start, end in (
+                    ("peak", cursor, peak_end),
+                    ("trough", peak_end, trough_end),
+                ):
+                    inserters[UserCycleEvent].add(
+                        {
+                            "user_daily_record_id": record_id,
+                            "event_type": event_type,
+                            "start_time": start.time(),
+                            "end_time": end.time(),
+                        }
+                    )
+                cursor = trough_end
+
+            for _ in range(_poisson(rng, profile["activity"])):
+                at = wake + timedelta(seconds=rng.randint(0, 16 * 3600))
+                at = min(at, now_utc)
+                inserters[AnalyticsEvent].add(
+                    {
+                        "user_id": user_id,
+                        "event": rng.choices(event_names, event_weights)[0],
+                        "meta": {"page": rng.choice(PAGES)},
+                        "timestamp": at,
+                    }
+                )
+            record_id += 1
+
+        user_id += 1
+
+    lead_start = _next_id(connection, Leads)
+    for i in range(lead_start, lead_start + leads):
+        day = start_date + timedelta(days=rng.randrange(max(days, 1)))
+        at = datetime.combine(day, datetime.min.time()) + timedelta(
+            seconds=rng.randint(0, 86399)
+        )
+        inserters[Leads].add(
+            {
+                "email": f"lead{i}@example.com",
+                "name": rng.choice(FIRST_NAMES),
+                "timestamp": min(at, now_local),
+            }
+        )
+
+    for inserter in inserters.values():
+        inserter.flush()
+
+    if connection.dialect.name == "postgresql":
+        # Explicit ids bypass the sequences, move them past what we inserted
+        for model in (User, UserDailyRecord):
+            table = model.__table__.name
+            connection.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                    f'(SELECT MAX(id) FROM "{table}"))'
+                )
+            )
+
+    totals = {
+        model.__tablename__: inserter.total for model, inserter in inserters.items()
+    }
+    # Core inserts don't go through the ORM flush hook that maintains these
+    for name in ("user", "user_daily_record", "leads"):
+        if totals[name]:
+            increment(connection, name, totals[name])
+
+    db.session.commit()
+    logger.info(
+        "Seeded users %d-%d in %.1fs: %s",
+        first_user_id,
+        user_id - 1,
+        time.perf_counter() - started,
+        totals,
+    )
+    return totals
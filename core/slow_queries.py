@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+from flask import request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+MAX_FINGERPRINTS = 500
+
+_settings = {
+    "threshold_ms": None,
+    "sample_rate": 1.0,
+    "explain": True,
+    "log_params": False,
+}
+_stats = {}
+_lock = threading.Lock()
+_listening = False
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?|:\w+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def init_slow_query_log(app):
+    """
+    Log statements slower than SLOW_QUERY_MS with the route that ran them and
+    their query plan. Every slow statement is counted; SLOW_QUERY_SAMPLE_RATE
+    (0-1) limits how many are logged and explained. Logged statements are
+    fingerprints and parameters are reduced to their types, so user data
+    doesn't end up in the logs, unless SLOW_QUERY_LOG_PARAMS is set to debug
+    a plan that depends on the values.
+    """
+    global _listening
+    threshold = app.config.get("SLOW_QUERY_MS")
+    if threshold is None:
+        return
+
+    _settings["threshold_ms"] = float(threshold)
+    _settings["sample_rate"] = app.config.get("SLOW_QUERY_SAMPLE_RATE", 1.0)
+    _settings["explain"] = app.config.get("SLOW_QUERY_EXPLAIN", True)
+    _settings["log_params"] = app.config.get("SLOW_QUERY_LOG_PARAMS", False)
+
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listening = True
+
+
+def fingerprint(statement):
+    """Normalize a statement so calls differing only in values group together."""
+    sql = _STRING.sub("?", statement)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_slow_query_start", None)
+    threshold = _settings["threshold_ms"]
+    if started is None or threshold is None:
+        return
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms < threshold:
+        return
+
+    route = request.endpoint if has_request_context() else None
+    sql = fingerprint(statement)
+    key = hashlib.sha1(sql.encode()).hexdigest()[:12]
+    # Counted before sampling so the top-N totals are exact
+    sampled = random.random() < _settings["sample_rate"]
+    plan = None
+    if sampled and _settings["explain"] and not executemany:
+        plan = _explain(conn, statement, parameters)
+    _record(key, sql, elapsed_ms, route, plan)
+    if not sampled:
+        return
+
+    params = parameters if _settings["log_params"] else _redact(parameters)
+    logger.warning(
+        json.dumps(
+            {
+                "slow_query": key,
+                "duration_ms": round(elapsed_ms, 2),
+                "route": route,
+                "statement": sql,
+                "parameters": params,
+                "plan": plan,
+            },
+            default=repr,
+        )
+    )
+
+
+def _redact(parameters):
+    """Bound parameters with each value replaced by its type name."""
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(v).__name__ for v in parameters]
+    return type(parameters).__name__
+
+
+def _explain(conn, statement, parameters):
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return None
+
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect in ("postgresql", "mysql"):
+        prefix = "EXPLAIN "
+    else:
+        return None
+
+    # A separate raw DBAPI cursor, so the plan query isn't itself timed/logged
+    # and the original cursor's pending results are left alone. On PostgreSQL
+    # a failed statement aborts the whole transaction, so the EXPLAIN runs in
+    # a savepoint that's rolled back if it fails.
+    savepoint = dialect != "sqlite"
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+    except Exception as e:
+        return [f"EXPLAIN failed: {type(e).__name__}"]
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        cursor.execute(prefix + statement, parameters)
+        plan = [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    except Exception as e:
+        if savepoint:
+            try:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            except Exception:
+                logger.exception("Could not roll back a failed EXPLAIN")
+        return [f"EXPLAIN failed: {type(e).__name__}"]
+    finally:
+        cursor.close()
+
+
+def _record(key, sql, elapsed_ms, route, plan):
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            if len(_stats) >= MAX_FINGERPRINTS:
+                # Forget the fingerprint that has cost the least in total
+                del _stats[min(_stats, key=lambda k: _stats[k]["total_ms"])]
+            entry = _stats[key] = {
+                "fingerprint": key,
+                "statement": sql,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "routes": {},
+                "plan": None,
+            }
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        if route:
+            entry["routes"][route] = entry["routes"].get(route, 0) + 1
+        if plan:
+            entry["plan"] = plan
+
+
+def top_slow_queries(limit=20, sort="total_ms"):
+    """Slowest fingerprints seen by this worker, worst first."""
+    with _lock:
+        entries = [dict(e, routes=dict(e["routes"])) for e in _stats.values()]
+    entries.sort(key=lambda e: e[sort], reverse=True)
+    for e in entries:
+        e["total_ms"] = round(e["total_ms"], 2)
+        e["max_ms"] = round(e["max_ms"], 2)
+        e["avg_ms"] = round(e["total_ms"] / e["count"], 2)
+    return entries[:limit]
+
+
+def reset_slow_queries():
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,104 @@
+import logging
+import socket
+import time
+from datetime import date, timedelta
+from urllib.parse import urlparse
+
+from sqlalchemy import func, text
+
+from .extensions import db
+from .models import User, UserDailyRecord
+from .outbound import http_session
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(app, budget=None):
+    """
+    Get a fresh worker ready before it takes traffic: fill the connection
+    pools, resolve the weather provider, set up the outbound HTTP session
+    and prime the baseline and wake-time caches for recently active users.
+    Every step is best effort, and steps not started within budget seconds
+    are skipped.
+
+    Returns {step: milliseconds, or None if skipped} plus "total".
+    """
+    timings = {}
+    started = time.perf_counter()
+    deadline = None if budget is None else started + budget
+    with app.app_context():
+        for name, step in (
+            ("connections", _open_connections),
+            ("weather_dns", _resolve_weather_host),
+            ("http_session", _open_http_session),
+            ("caches", _prime_caches),
+        ):
+            if deadline is not None and time.perf_counter() >= deadline:
+                logger.warning("Warm-up budget spent, skipping %s", name)
+                timings[name] = None
+                continue
+            step_started = time.perf_counter()
+            try:
+                step(app)
+            except Exception:
+                logger.exception("Warm-up step %s failed", name)
+            timings[name] = round((time.perf_counter() - step_started) * 1000, 1)
+            # The request session isn't torn down outside a request
+            db.session.remove()
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
+
+
+def _open_connections(app):
+    # Check out a full pool's worth at once so every slot gets a connection
+    for engine in db.engines.values():
+        size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+        connections = []
+        try:
+            for _ in range(size):
+                connection = engine.connect()
+                connections.append(connection)
+                connection.execute(text("SELECT 1"))
+        finally:
+            for connection in connections:
+                connection.close()
+
+
+def _resolve_weather_host(app):
+    from utils.weather import WEATHER_API_URL
+
+    url = urlparse(WEATHER_API_URL)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    socket.getaddrinfo(url.hostname, port, type=socket.SOCK_STREAM)
+
+
+def _open_http_session(app):
+    # requests is deferred at startup so CLI and script imports stay light,
+    # but the vibe score path needs it (and the session) on its first miss
+    http_session()
+
+
+def _prime_caches(app):
+    limit = app.config.get("WARMUP_USERS", 50)
+    if not limit:
+        return
+    since = date.today() - timedelta(days=app.config.get("WARMUP_DAYS", 1))
+
+    recent = (
+        db.session.query(UserDailyRecord.user_id)
+        .filter(UserDailyRecord.date >= since)
+        .group_by(UserDailyRecord.user_id)
+        .order_by(func.max(UserDailyRecord.date).desc())
+        .limit(limit)
+        .subquery()
+    )
+    users = User.query.filter(User.id.in_(db.select(recent.c.user_id))).all()
+
+    # User rows themselves aren't cached, the JWT user lookup loads them per
+    # request; weather is keyed by location, which isn't known until asked
+    today = date.today()
+    for user in users:
+        for metric in User.BASELINE_METRICS:
+            user.get_baseline(metric)
+        # The ultradian schedule, see User.get_wake_time
+        user.get_wake_time(today)
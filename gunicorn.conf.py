@@ -0,0 +1,165 @@
+# ultradia/gunicorn.conf.py
+"""
+Gunicorn settings, used by the procfile:
+
+    gunicorn -c gunicorn.conf.py application:application
+
+Workers and threads are sized from the CPUs available to this process, and
+exported as GUNICORN_WORKERS / GUNICORN_THREADS before the app is imported
+so config.py sizes the DB pools to match. Every worker warms up (core/warmup.py)
+before it accepts its first request, for at most WARMUP_TIMEOUT seconds.
+
+GUNICORN_WORKER_CLASS picks the serving mode:
+
+    sync     one request per worker at a time
+    gthread  GUNICORN_THREADS requests per worker (default when threads > 1)
+    gevent   GUNICORN_WORKER_CONNECTIONS greenlets per worker. Sockets are
+             monkey-patched, so outbound HTTP yields to other requests, and
+             psycopg2 is made cooperative with psycogreen. DB sessions are
+             scoped to the app context, which lives in a contextvar, so each
+             greenlet gets its own.
+"""
+
+import glob
+import os
+import threading
+
+
+def _cores():
+    try:
+        # Respects CPU affinity / container cpusets, unlike cpu_count()
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+cores = _cores()
+
+# Requests mostly wait on the database and the weather API, so a few threads
+# per worker; processes scale with cores for the CPU-bound parts
+workers = int(
+    os.getenv("GUNICORN_WORKERS", os.getenv("WEB_CONCURRENCY", cores * 2 + 1))
+)
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync")
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 100))
+
+os.environ["GUNICORN_WORKERS"] = str(workers)
+os.environ["GUNICORN_THREADS"] = str(threads)
+os.environ["GUNICORN_WORKER_CLASS"] = worker_class
+os.environ["GUNICORN_WORKER_CONNECTIONS"] = str(worker_connections)
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+# Preloading would import the app before gevent patches the worker
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1" and worker_class != "gevent"
+accesslog = os.getenv("GUNICORN_ACCESSLOG")  # "-" for stdout
+
+
+# core/metrics.py: each worker writes metrics-<pid>.json here
+metrics_dir = os.getenv("METRICS_MULTIPROC_DIR")
+
+
+def on_starting(server):
+    # Values from a previous run would be summed into /metrics forever
+    if metrics_dir:
+        for pattern in ("metrics-*.json*", "dead-*.json", "aggregate.json*"):
+            for path in glob.glob(os.path.join(metrics_dir, pattern)):
+                _remove(path)
+
+
+def child_exit(server, worker):
+    # Hand the exited worker's counters and histograms to the next /metrics,
+    # which adds them to aggregate.json. Dropping them would make host-wide
+    # totals fall, which rate() reads as a huge increase. (Nothing here is a
+    # gauge, which would be dropped instead.)
+    if metrics_dir:
+        path = os.path.join(metrics_dir, f"metrics-{worker.pid}.json")
+        try:
+            os.replace(path, os.path.join(metrics_dir, f"dead-{worker.pid}.json"))
+        except FileNotFoundError:
+            pass
+        _remove(f"{path}.tmp")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def post_fork(server, worker):
+    # With preload_app the master created the engines; connections must not
+    # be shared across processes, so each worker starts with empty pools
+    if preload_app:
+        from core.extensions import db
+
+        with worker.app.wsgi().app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    # Runs once the worker has loaded the app and before it accepts requests
+    if "gevent" in worker.cfg.worker_class_str:
+        _make_psycopg_green(worker)
+
+    from flask import Flask
+
+    app = worker.wsgi
+    if not isinstance(app, Flask) or not app.config.get("WARMUP_ENABLED", True):
+        return
+
+    from core.warmup import warm_up
+
+    # The arbiter kills a worker that hasn't started serving within `timeout`,
+    # so a slow warm-up must not eat into it
+    budget = min(app.config.get("WARMUP_TIMEOUT", 10), worker.cfg.timeout / 2)
+    timings = {}
+
+    def run():
+        try:
+            timings.update(warm_up(app, budget))
+        except Exception:
+            worker.log.exception("Worker %s warm-up failed", worker.pid)
+
+    # In a thread, so a step stuck on an unreachable host can't hold the
+    # worker past the budget; it finishes (or times out) in the background
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    thread.join(budget)
+    if thread.is_alive() or not timings:
+        worker.log.warning(
+            "Worker %s serving without a full warm-up (budget %.0fs)",
+            worker.pid,
+            budget,
+        )
+        return
+    worker.log.info(
+        "Worker %s warmed up in %.0fms (%s)",
+        worker.pid,
+        timings.pop("total"),
+        ", ".join(
+            f"{step} {'skipped' if ms is None else f'{ms:.0f}ms'}"
+            for step, ms in timings.items()
+        ),
+    )
+
+
+def _make_psycopg_green(worker):
+    # Without this a psycopg2 query blocks every greenlet in the worker
+    try:
+        import psycopg2  # noqa: F401
+    except ImportError:
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        worker.log.warning(
+            "psycogreen is not installed, DB queries will block the gevent worker"
+        )
+        return
+    patch_psycopg()
@@ -1,52 +1,178 @@
-import requests
-import boto3
+import argparse
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
 from dotenv import load_dotenv
 
 if os.getenv("FLASK_ENV") == "development":
     load_dotenv()
 
+DEFAULT_URLS = "http://localhost:5000/health,http://localhost:5000/health/deep"
+
 
-def health_check(url="http://localhost:5000/api/health"):
+def health_check(url="http://localhost:5000/health", timeout=5, session=None):
     """
     Perform a health check on the given URL.
 
     Args:
         url (str): The URL to check.
+        timeout (float): Seconds before the request is given up on.
 
     Returns:
         dict: A dictionary containing the status of the health check.
     """
+    started = time.perf_counter()
+    try:
+        response = (session or requests).get(url, timeout=timeout)
+        result = {"url": url, "code": response.status_code}
+        result["status"] = "healthy" if response.status_code == 200 else "unhealthy"
+    except requests.exceptions.RequestException as e:
+        result = {"status": "unhealthy", "url": url, "error": str(e)}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
 
-    sns = boto3.client("sns")
-    topic_arn = os.environ.get("HEALTHCHECK_ARN")
 
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            return {"status": "healthy", "url": url}
-
-        # Handle bad status codes
-        if topic_arn:
-            sns.publish(
-                TopicArn=topic_arn,
-                Message=f"Health check failed for {url}. Status code: {response.status_code}",
-                Subject="Health Check Alert",
-            )
+class Alerter:
+    """
+    Publishes to the HEALTHCHECK_ARN SNS topic. With no topic, or with
+    HEALTHCHECK_SNS_STUB=1, alerts are printed instead.
+    """
 
-        return {"status": "unhealthy", "url": url, "code": response.status_code}
+    def __init__(self, topic_arn=None, stub=False):
+        self.topic_arn = topic_arn
+        self.stub = stub or not topic_arn
+        self._sns = None
 
-    except requests.exceptions.RequestException as e:
-        if topic_arn:
-            sns.publish(
-                TopicArn=topic_arn,
-                Message=f"Health check failed for {url}. Error: {str(e)}",
-                Subject="Health Check Exception",
+    def send(self, subject, message):
+        if self.stub:
+            print(f"[ALERT] {subject}: {message}")
+            return
+        if self._sns is None:
+            import boto3
+
+            self._sns = boto3.client("sns")
+        self._sns.publish(TopicArn=self.topic_arn, Message=message, Subject=subject)
+
+
+class Monitor:
+    """
+    Tracks recent latencies per URL and alerts once a URL has failed
+    `threshold` checks in a row, then again when it recovers.
+    """
+
+    def __init__(self, urls, alerter, threshold=3, window=100):
+        self.alerter = alerter
+        self.threshold = threshold
+        self.latencies = {url: deque(maxlen=window) for url in urls}
+        self.failures = {url: 0 for url in urls}
+        self.alerting = {url: False for url in urls}
+
+    def record(self, result):
+        url = result["url"]
+        self.latencies[url].append(result["latency_ms"])
+
+        if result["status"] == "healthy":
+            if self.alerting[url]:
+                self.alerter.send(
+                    "Health Check Recovered",
+                    f"{url} is healthy again after {self.failures[url]} failed checks.",
+                )
+            self.failures[url] = 0
+            self.alerting[url] = False
+            return
+
+        self.failures[url] += 1
+        if self.failures[url] >= self.threshold and not self.alerting[url]:
+            self.alerting[url] = True
+            detail = result.get("error") or f"Status code: {result.get('code')}"
+            self.alerter.send(
+                "Health Check Alert",
+                f"Health check failed {self.failures[url]} times in a row for {url}. "
+                f"{detail}",
             )
 
-        return {"status": "unhealthy", "url": url, "error": str(e)}
+    def percentiles(self, url):
+        values = sorted(self.latencies[url])
+        if not values:
+            return {}
+
+        def pick(p):
+            return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+        return {"p50_ms": pick(50), "p95_ms": pick(95), "p99_ms": pick(99)}
+
+
+def run(urls, interval, timeout, threshold, alerter, rounds=None):
+    monitor = Monitor(urls, alerter, threshold=threshold)
+    # requests.Session isn't thread-safe, so each pool thread keeps its own
+    # (and its own keep-alive connections) across rounds
+    local = threading.local()
+
+    def check(url):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return health_check(url, timeout, local.session)
+
+    completed = 0
+    with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        while rounds is None or completed < rounds:
+            started = time.monotonic()
+            results = pool.map(check, urls)
+            for result in results:
+                monitor.record(result)
+                print(
+                    result["status"],
+                    result["url"],
+                    result.get("code", ""),
+                    f"{result['latency_ms']}ms",
+                    monitor.percentiles(result["url"]),
+                )
+            completed += 1
+            if rounds is None or completed < rounds:
+                time.sleep(max(0, interval - (time.monotonic() - started)))
+    return monitor
 
 
-# Example usage
 if __name__ == "__main__":
-    print(health_check())
+    parser = argparse.ArgumentParser(
+        description="Probe health endpoints and alert on sustained failures."
+    )
+    parser.add_argument(
+        "--urls",
+        default=os.getenv("HEALTHCHECK_URLS", DEFAULT_URLS),
+        help="Comma separated.",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=30, help="Seconds between rounds."
+    )
+    parser.add_argument("--timeout", type=float, default=5)
+    parser.add_argument(
+        "--failures", type=int, default=3, help="Consecutive failures before alerting."
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Run a single round and exit."
+    )
+    parser.add_argument(
+        "--stub-sns",
+        action="store_true",
+        help="Print alerts instead of publishing to SNS.",
+    )
+    args = parser.parse_args()
+
+    alerter = Alerter(
+        os.environ.get("HEALTHCHECK_ARN"),
+        stub=args.stub_sns or os.getenv("HEALTHCHECK_SNS_STUB") == "1",
+    )
+    urls = [u.strip() for u in args.urls.split(",") if u.strip()]
+    run(
+        urls,
+        args.interval,
+        args.timeout,
+        args.failures,
+        alerter,
+        rounds=1 if args.once else None,
+    )
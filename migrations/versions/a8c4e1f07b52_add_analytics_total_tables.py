@@ -0,0 +1,59 @@
+"""add global analytics total tables
+
+Revision ID: a8c4e1f07b52
+Revises: e5b90c3d7a18
+Create Date: 2026-10-19 15:02:41.118305
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "a8c4e1f07b52"
+down_revision = "e5b90c3d7a18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "analytics_hourly_total",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event", sa.String(length=100), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("event", "bucket", name="uq_hourly_total_key"),
+    )
+    op.create_index(
+        "ix_hourly_total_bucket", "analytics_hourly_total", ["bucket"], unique=False
+    )
+
+    op.create_table(
+        "analytics_daily_total",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event", sa.String(length=100), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("event", "bucket", name="uq_daily_total_key"),
+    )
+    op.create_index(
+        "ix_daily_total_bucket", "analytics_daily_total", ["bucket"], unique=False
+    )
+
+    # Backfill from the per-user rollups, which cover everything up to the watermark
+    for period in ("hourly", "daily"):
+        op.execute(
+            f"INSERT INTO analytics_{period}_total (event, bucket, count)"
+            f" SELECT event, bucket, SUM(count) FROM analytics_{period}_rollup"
+            " GROUP BY event, bucket"
+        )
+
+
+def downgrade():
+    op.drop_index("ix_daily_total_bucket", table_name="analytics_daily_total")
+    op.drop_table("analytics_daily_total")
+    op.drop_index("ix_hourly_total_bucket", table_name="analytics_hourly_total")
+    op.drop_table("analytics_hourly_total")
@@ -0,0 +1,62 @@
+"""add analytics rollup tables
+
+Revision ID: b3f1c2d4e5a6
+Revises: e72bdb62f61c
+Create Date: 2026-10-19 09:12:03.412877
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "b3f1c2d4e5a6"
+down_revision = "e72bdb62f61c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "analytics_hourly_rollup",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event", sa.String(length=100), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("event", "bucket", "user_id", name="uq_hourly_rollup_key"),
+    )
+    op.create_index(
+        "ix_hourly_rollup_bucket", "analytics_hourly_rollup", ["bucket"], unique=False
+    )
+
+    op.create_table(
+        "analytics_daily_rollup",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event", sa.String(length=100), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("event", "bucket", "user_id", name="uq_daily_rollup_key"),
+    )
+    op.create_index(
+        "ix_daily_rollup_bucket", "analytics_daily_rollup", ["bucket"], unique=False
+    )
+
+    op.create_table(
+        "rollup_watermark",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("last_id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade():
+    op.drop_table("rollup_watermark")
+    op.drop_index("ix_daily_rollup_bucket", table_name="analytics_daily_rollup")
+    op.drop_table("analytics_daily_rollup")
+    op.drop_index("ix_hourly_rollup_bucket", table_name="analytics_hourly_rollup")
+    op.drop_table("analytics_hourly_rollup")
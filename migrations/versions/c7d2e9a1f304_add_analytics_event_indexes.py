@@ -0,0 +1,40 @@
+"""add analytics_event composite indexes
+
+Revision ID: c7d2e9a1f304
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-19 10:03:47.215530
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c7d2e9a1f304"
+down_revision = "b3f1c2d4e5a6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("analytics_event", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_analytics_event_timestamp_id", ["timestamp", "id"], unique=False
+        )
+        batch_op.create_index(
+            "ix_analytics_event_event_timestamp_id",
+            ["event", "timestamp", "id"],
+            unique=False,
+        )
+        batch_op.create_index(
+            "ix_analytics_event_user_timestamp_id",
+            ["user_id", "timestamp", "id"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("analytics_event", schema=None) as batch_op:
+        batch_op.drop_index("ix_analytics_event_user_timestamp_id")
+        batch_op.drop_index("ix_analytics_event_event_timestamp_id")
+        batch_op.drop_index("ix_analytics_event_timestamp_id")
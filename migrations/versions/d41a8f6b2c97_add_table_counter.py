@@ -0,0 +1,35 @@
+"""add table_counter for admin overview counts
+
+Revision ID: d41a8f6b2c97
+Revises: c7d2e9a1f304
+Create Date: 2026-10-19 10:41:18.903114
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d41a8f6b2c97"
+down_revision = "c7d2e9a1f304"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "table_counter",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.Column("reconciled_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    for table in ("user", "user_daily_record", "leads"):
+        op.execute(
+            f"INSERT INTO table_counter (name, value, reconciled_at) "
+            f"SELECT '{table}', COUNT(*), CURRENT_TIMESTAMP FROM \"{table}\""
+        )
+
+
+def downgrade():
+    op.drop_table("table_counter")
@@ -0,0 +1,29 @@
+"""add lower(email) indexes for admin prefix search
+
+Revision ID: e5b90c3d7a18
+Revises: d41a8f6b2c97
+Create Date: 2026-10-19 11:20:55.671204
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e5b90c3d7a18"
+down_revision = "d41a8f6b2c97"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # varchar_pattern_ops lets PostgreSQL use the index for LIKE 'prefix%'
+    # under any collation; SQLite has no operator classes.
+    ops = " varchar_pattern_ops" if op.get_bind().dialect.name == "postgresql" else ""
+    op.execute(f'CREATE INDEX ix_user_email_lower ON "user" (lower(email){ops})')
+    op.execute(f"CREATE INDEX ix_leads_email_lower ON leads (lower(email){ops})")
+
+
+def downgrade():
+    op.drop_index("ix_leads_email_lower", table_name="leads")
+    op.drop_index("ix_user_email_lower", table_name="user")
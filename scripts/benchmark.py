@@ -0,0 +1,436 @@
+# ultradia/scripts/benchmark.py
+"""
+Reproducible load test for the main API endpoints.
+
+Boots the app against a freshly seeded SQLite database, with the weather API
+pointed at a local stub, drives a weighted mix of requests from concurrent
+clients and reports throughput and p50/p95/p99 per endpoint. --db-uri seeds
+another database instead; its tables are dropped first, so it needs --reset.
+
+    python scripts/benchmark.py --duration 30 --concurrency 8
+    python scripts/benchmark.py --save-baseline bench/baseline.json
+    python scripts/benchmark.py --baseline bench/baseline.json --tolerance 0.2
+
+With --server gunicorn the app runs under gunicorn with the production
+gunicorn.conf.py, including worker warm-up, instead of the built-in threaded
+Werkzeug server (set --workers/--threads/--worker-class).
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from weather_stub import start_weather_stub  # noqa: E402
+
+HEADERS = {
+    "User-Agent": "ultradia-bench/1.0",
+    "Referer": "http://localhost:3000/",
+    "Content-Type": "application/json",
+}
+
+
+def _random_vibe_path(r):
+    lat, lon = r.uniform(-80, 80), r.uniform(-180, 180)
+    return f"/api/vibe-score/?lat={lat:.4f}&lon={lon:.4f}"
+
+
+# name -> (weight, method, path or path factory, json body factory)
+MIXES = {
+    "default": {
+        "records_today": (20, "GET", "/api/records/", None),
+        "records_all": (10, "GET", "/api/records/all", None),
+        "records_save": (
+            5,
+            "POST",
+            "/api/records/",
+            lambda r: {
+                "hrv": r.randint(40, 90),
+                "rhr": r.randint(45, 70),
+                "sleep_duration": 7.2,
+            },
+        ),
+        "ultradian": (15, "GET", "/api/ultradian/", None),
+        "ultradian_generate": (3, "POST", "/api/ultradian/", lambda r: {}),
+        "cycles": (10, "GET", "/api/cycles/", None),
+        "cycles_today": (10, "GET", "/api/cycles/today", None),
+        "vibe_score": (15, "GET", "/api/vibe-score/", None),
+        "analytics": (
+            10,
+            "POST",
+            "/api/analytics/",
+            lambda r: {"event": "page_view", "meta": {"page": "/dashboard"}},
+        ),
+        "analytics_batch": (
+            2,
+            "POST",
+            "/api/analytics/batch",
+            lambda r: [{"event": "click", "meta": {"i": i}} for i in range(10)],
+        ),
+    },
+    "vibe": {
+        "vibe_score": (1, "GET", "/api/vibe-score/", None),
+    },
+    # Fresh coordinates every time, so each request misses the weather cache
+    # and waits on the (stubbed) provider: the I/O-bound case
+    "vibe_uncached": {
+        "vibe_score": (1, "GET", _random_vibe_path, None),
+    },
+}
+
+
+class BenchConfig:
+    """Standalone config so the benchmark never needs PROD_DB_URI."""
+
+    SQLALCHEMY_DATABASE_URI = os.getenv("BENCH_DB_URI", "sqlite:///bench.db")
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = "bench-secret"
+    JWT_SECRET_KEY = "bench-jwt-secret-bench-jwt-secret"
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)
+    RUNNING = "Benchmark Config is running"
+    DEBUG = False
+
+
+def create_bench_app():
+    """App factory used both in-process and as the gunicorn target."""
+    os.environ["FLASK_ENV"] = "development"  # verify_origin allows localhost referers
+    from core import create_app
+
+    return create_app(config=BenchConfig)
+
+
+def seed(app, users, days, seed_value):
+    """Recreate the schema and fill it with generated data. Returns user ids."""
+    from sqlalchemy import select
+
+    from core.extensions import db
+    from core.models import User
+    from core.seed import generate
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        generate(users, days, leads=users, seed=seed_value)
+        return list(db.session.scalars(select(User.id)))
+
+
+def tokens_for(app, user_ids):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        return [create_access_token(identity=str(i)) for i in user_ids]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, app, env):
+    port = free_port()
+    if args.server == "gunicorn":
+        cmd = [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--config",
+            os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), "..", "gunicorn.conf.py"
+            ),
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--log-level",
+            "warning",
+            "--chdir",
+            os.path.dirname(os.path.abspath(__file__)),
+            "--pythonpath",
+            os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+            "benchmark:create_bench_app()",
+        ]
+        # Sized through the env so config.py's pool defaults match, as in production
+        env = dict(
+            env,
+            GUNICORN_WORKERS=str(args.workers),
+            GUNICORN_THREADS=str(args.threads),
+            GUNICORN_WORKER_CLASS=args.worker_class,
+            GUNICORN_WORKER_CONNECTIONS=str(args.worker_connections),
+        )
+        proc = subprocess.Popen(cmd, env=env)
+        stop = proc.terminate
+    else:
+        from werkzeug.serving import make_server
+
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        server = make_server("127.0.0.1", port, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        stop = server.shutdown
+
+    base = f"http://127.0.0.1:{port}"
+    _wait_until_up(base)
+    return base, stop
+
+
+def _wait_until_up(base, timeout=30):
+    import requests
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(base + "/health", headers=HEADERS, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {base} did not come up")
+
+
+def run_load(base, tokens, mix, duration, concurrency, seed_value):
+    import requests
+
+    names = list(mix)
+    weights = [mix[n][0] for n in names]
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(n):
+        rng = random.Random(seed_value + n)
+        session = requests.Session()
+        local_lat, local_err = defaultdict(list), defaultdict(int)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            _, method, path, body = mix[name]
+            if callable(path):
+                path = path(rng)
+            headers = dict(HEADERS, Authorization=f"Bearer {rng.choice(tokens)}")
+            started = time.perf_counter()
+            try:
+                resp = session.request(
+                    method,
+                    base + path,
+                    headers=headers,
+                    json=body(rng) if body else None,
+                    timeout=30,
+                )
+                # A 4xx is as much a failure as a 5xx: the mix only sends
+                # requests that should succeed
+                ok = resp.status_code < 400
+            except requests.RequestException:
+                ok = False
+            local_lat[name].append(time.perf_counter() - started)
+            if not ok:
+                local_err[name] += 1
+        with lock:
+            for k, v in local_lat.items():
+                latencies[k].extend(v)
+            for k, v in local_err.items():
+                errors[k] += v
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, errors, elapsed):
+    results = {}
+    all_latencies = []
+    for name, values in sorted(latencies.items()):
+        all_latencies.extend(values)
+        results[name] = {
+            "requests": len(values),
+            "errors": errors.get(name, 0),
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+        }
+    if all_latencies:
+        results["_total"] = {
+            "requests": len(all_latencies),
+            "errors": sum(errors.values()),
+            "rps": round(len(all_latencies) / elapsed, 2),
+            "p50_ms": round(percentile(all_latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(all_latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(all_latencies, 99) * 1000, 2),
+        }
+    return results
+
+
+def print_table(results, baseline=None):
+    print(
+        f"{'endpoint':<20}{'reqs':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    )
+    for name, r in results.items():
+        line = (
+            f"{name:<20}{r['requests']:>8}{r['errors']:>6}{r['rps']:>9}"
+            f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+        )
+        if baseline and name in baseline:
+            b = baseline[name]
+            line += (
+                f"   p95 {_delta(r['p95_ms'], b['p95_ms'])}"
+                f"  rps {_delta(r['rps'], b['rps'])}"
+            )
+        print(line)
+
+
+def _delta(new, old):
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def regressions(results, baseline, tolerance):
+    """Endpoints whose p95 grew, or throughput fell, by more than tolerance."""
+    found = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if not b:
+            continue
+        if b["p95_ms"] and r["p95_ms"] > b["p95_ms"] * (1 + tolerance):
+            found.append(f"{name}: p95 {b['p95_ms']}ms -> {r['p95_ms']}ms")
+        if b["rps"] and r["rps"] < b["rps"] * (1 - tolerance):
+            found.append(f"{name}: rps {b['rps']} -> {r['rps']}")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--db-uri", default=None, help="Defaults to a temporary SQLite file."
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Allow dropping every table of --db-uri to seed it.",
+    )
+    parser.add_argument("--weather-latency-ms", type=int, default=0)
+    parser.add_argument(
+        "--server", choices=["werkzeug", "gunicorn"], default="werkzeug"
+    )
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument(
+        "--worker-class", default="sync", help="sync, gthread or gevent."
+    )
+    parser.add_argument(
+        "--worker-connections",
+        type=int,
+        default=100,
+        help="Greenlets per gevent worker.",
+    )
+    parser.add_argument("--out", help="Write results JSON here.")
+    parser.add_argument(
+        "--save-baseline", help="Write results JSON as the new baseline."
+    )
+    parser.add_argument("--baseline", help="Compare against a stored baseline JSON.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    if args.db_uri and not args.reset:
+        # seed() starts with drop_all(), don't run it on a real database by accident
+        parser.error(
+            "--db-uri drops and recreates every table, pass --reset to confirm"
+        )
+
+    tmpdir = tempfile.mkdtemp(prefix="ultradia-bench-")
+    db_uri = args.db_uri or f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    _stub, weather_url = start_weather_stub(latency_ms=args.weather_latency_ms)
+
+    os.environ["BENCH_DB_URI"] = db_uri
+    os.environ["WEATHER_API_URL"] = weather_url
+    BenchConfig.SQLALCHEMY_DATABASE_URI = db_uri
+
+    app = create_bench_app()
+    started = time.perf_counter()
+    user_ids = seed(app, args.users, args.days, args.seed)
+    seeded_in = time.perf_counter() - started
+    print(f"Seeded {args.users} users x {args.days} days in {seeded_in:.1f}s")
+    tokens = tokens_for(app, user_ids)
+
+    base, stop = start_server(args, app, dict(os.environ))
+    try:
+        latencies, errors, elapsed = run_load(
+            base, tokens, MIXES[args.mix], args.duration, args.concurrency, args.seed
+        )
+    finally:
+        stop()
+
+    results = summarize(latencies, errors, elapsed)
+    processes = args.workers if args.server == "gunicorn" else 1
+    if "_total" in results:
+        results["_total"]["rps_per_worker"] = round(
+            results["_total"]["rps"] / processes, 2
+        )
+    report = {
+        "meta": {
+            "mix": args.mix,
+            "users": args.users,
+            "days": args.days,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "server": args.server,
+            "workers": args.workers,
+            "threads": args.threads,
+            "worker_class": args.worker_class,
+            "worker_connections": args.worker_connections,
+            "weather_latency_ms": args.weather_latency_ms,
+            "db": db_uri.split(":")[0],
+        },
+        "results": results,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    print_table(results, baseline)
+    if "_total" in results:
+        per_worker = results["_total"]["rps_per_worker"]
+        print(f"Throughput per worker: {per_worker} rps ({processes} worker(s))")
+
+    for path in filter(None, [args.out, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {path}")
+
+    if baseline:
+        found = regressions(results, baseline, args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# ultradia/scripts/check_startup.py
+"""
+Cold-start regression check. Imports core and creates the app in a fresh
+interpreter under `python -X importtime`, then fails if:
+
+  * importing core + create_app() takes longer than --budget-ms (median of --runs)
+  * any --forbid module (heavy integrations that should load lazily) got imported
+
+    python scripts/check_startup.py
+    python scripts/check_startup.py --budget-ms 800 --top 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Only needed for outbound calls, Google login and migrations
+DEFAULT_FORBIDDEN = ["requests", "authlib", "alembic", "flask_migrate"]
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+from core import create_app
+imported = time.perf_counter()
+
+class StartupConfig:
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = "startup"
+    JWT_SECRET_KEY = "startup-check-startup-check-startup"
+    RUNNING = "Startup check"
+
+create_app(StartupConfig)
+created = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "create_ms": (created - imported) * 1000,
+    "modules": sorted(sys.modules),
+}}))
+"""
+
+
+def probe():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(root=ROOT)],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        env=dict(os.environ, FLASK_ENV="production"),
+    )
+    if result.returncode != 0:
+        sys.exit(f"App creation failed:\n{result.stderr[-3000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def import_cost_by_package(importtime_output):
+    """(self_us, package) summed per top-level package, most expensive first."""
+    totals = defaultdict(int)
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, _, name = line[len("import time:") :].split("|")
+        totals[name.strip().split(".")[0]] += int(own)
+    return sorted(((us, pkg) for pkg, us in totals.items()), reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", 1000))
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--top", type=int, default=10, help="Show the N most expensive packages."
+    )
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN)
+    args = parser.parse_args()
+
+    totals, last = [], None
+    for _ in range(args.runs):
+        result, importtime = probe()
+        totals.append(result["import_ms"] + result["create_ms"])
+        last = (result, importtime)
+
+    result, importtime = last
+    total = statistics.median(totals)
+    print(
+        f"import core: {result['import_ms']:.0f}ms, "
+        f"create_app: {result['create_ms']:.0f}ms"
+    )
+    print(
+        f"median total over {args.runs} runs: {total:.0f}ms "
+        f"(budget {args.budget_ms:.0f}ms)"
+    )
+
+    print("\nImport time by package:")
+    for own, package in import_cost_by_package(importtime)[: args.top]:
+        print(f"  {own / 1000:8.1f}ms  {package}")
+
+    failures = []
+    if total > args.budget_ms:
+        failures.append(
+            f"app creation took {total:.0f}ms, over the {args.budget_ms:.0f}ms budget"
+        )
+    loaded = set(result["modules"])
+    for module in args.forbid:
+        if module in loaded:
+            failures.append(
+                f"{module} is imported at startup, it should be imported lazily"
+            )
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# ultradia/scripts/json_benchmark.py
+"""
+Compare JSON response serialization for large record lists:
+
+  default   Flask's provider, dates pre-formatted with isoformat() (the old as_dict)
+  fallback  FastJSONProvider without orjson, raw date/time values
+  orjson    FastJSONProvider with orjson, raw date/time values
+
+    python scripts/json_benchmark.py --rows 1000 10000 --repeat 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from core.json_provider import FastJSONProvider, orjson  # noqa: E402
+
+
+class FallbackJSONProvider(FastJSONProvider):
+    use_orjson = False
+
+
+def make_records(n, rng):
+    today = date.today()
+    return [
+        {
+            "id": i,
+            "date": today - timedelta(days=i),
+            "wake_time": dtime(6 + rng.randint(0, 2), rng.randint(0, 59)),
+            "hrv": rng.randint(40, 90),
+            "rhr": rng.randint(45, 70),
+            "sleep_duration": round(rng.uniform(5.5, 9), 2),
+            "mood": "🙂",
+            "ended_at": datetime.combine(today, dtime(22, 30)),
+        }
+        for i in range(n)
+    ]
+
+
+def preformatted(records):
+    return [
+        {k: v.isoformat() if hasattr(v, "isoformat") else v for k, v in r.items()}
+        for r in records
+    ]
+
+
+def timed(app, payload_factory, repeat):
+    best = float("inf")
+    size = 0
+    with app.app_context():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = app.json.response(payload_factory())
+            size = len(response.get_data())
+            best = min(best, time.perf_counter() - started)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    providers = {"default": DefaultJSONProvider, "fallback": FallbackJSONProvider}
+    if orjson is not None:
+        providers["orjson"] = FastJSONProvider
+    else:
+        print("orjson is not installed, skipping it")
+
+    rng = random.Random(0)
+    print(f"{'rows':>8}{'provider':>10}{'best ms':>10}{'bytes':>10}{'speedup':>9}")
+    for n in args.rows:
+        records = make_records(n, rng)
+        baseline = None
+        for name, cls in providers.items():
+            app = Flask(__name__)
+            app.json = cls(app)
+
+            # The default provider can't serialize time, so it gets the
+            # pre-formatted dicts the models used to build in as_dict()
+            def factory(records=records, preformat=name == "default"):
+                return preformatted(records) if preformat else records
+
+            best, size = timed(app, factory, args.repeat)
+            baseline = baseline or best
+            print(
+                f"{n:>8}{name:>10}{best * 1000:>10.2f}{size:>10}"
+                f"{baseline / best:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
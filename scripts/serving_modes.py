@@ -0,0 +1,105 @@
+# ultradia/scripts/serving_modes.py
+"""
+Compare gunicorn serving modes on the I/O-bound vibe score endpoint. Each
+request misses the weather cache and waits --weather-latency-ms on the local
+stub provider, so throughput per worker shows how many requests a worker can
+keep waiting at once.
+
+    python scripts/serving_modes.py
+    python scripts/serving_modes.py --per-worker 32 --weather-latency-ms 200
+    python scripts/serving_modes.py --out bench/modes.json
+
+Every mode gets the same per-worker budget: 1 request for sync, --per-worker
+threads for gthread, --per-worker greenlets for gevent.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_mode(mode, args, out):
+    cmd = [
+        sys.executable,
+        os.path.join(HERE, "benchmark.py"),
+        "--server",
+        "gunicorn",
+        "--mix",
+        "vibe_uncached",
+        "--worker-class",
+        mode,
+        "--workers",
+        str(args.workers),
+        "--threads",
+        str(args.per_worker if mode == "gthread" else 1),
+        "--concurrency",
+        str(args.concurrency or args.per_worker * args.workers * 2),
+        "--weather-latency-ms",
+        str(args.weather_latency_ms),
+        "--duration",
+        str(args.duration),
+        "--out",
+        out,
+    ]
+    if mode == "gevent":
+        cmd += ["--worker-connections", str(args.per_worker)]
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+    with open(out) as f:
+        return json.load(f)["results"]["_total"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--modes", default="sync,gthread,gevent")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--per-worker", type=int, default=16, help="Threads or greenlets per worker."
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Client threads (default 2x server capacity).",
+    )
+    parser.add_argument("--weather-latency-ms", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--out", help="Write results JSON here.")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="ultradia-modes-")
+    results = {}
+    for mode in args.modes.split(","):
+        if mode == "gevent" and importlib.util.find_spec("gevent") is None:
+            print("Skipping gevent: not installed")
+            continue
+        print(f"Running {mode}...", flush=True)
+        results[mode] = run_mode(mode, args, os.path.join(tmpdir, f"{mode}.json"))
+
+    print(
+        f"\nvibe score, {args.weather_latency_ms}ms provider latency, "
+        f"{args.workers} worker(s)"
+    )
+    print(f"{'mode':<10}{'rps':>9}{'rps/worker':>12}{'p50':>9}{'p95':>9}{'err':>6}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<10}{r['rps']:>9}{r['rps_per_worker']:>12}"
+            f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['errors']:>6}"
+        )
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump({"meta": vars(args), "results": results}, f, indent=2)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
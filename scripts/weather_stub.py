@@ -0,0 +1,64 @@
+# ultradia/scripts/weather_stub.py
+"""
+Local stand-in for the Open-Meteo forecast API, for benchmarks and offline runs.
+
+    python scripts/weather_stub.py --port 8099 --latency-ms 150
+    WEATHER_API_URL=http://127.0.0.1:8099/v1/forecast python app.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPONSE = {
+    "current": {
+        "temperature_2m": 19.5,
+        "dew_point_2m": 11.2,
+        "relative_humidity_2m": 58,
+        "pressure_msl": 1016.4,
+    }
+}
+
+
+def make_handler(latency_ms):
+    body = json.dumps(RESPONSE).encode()
+
+    class WeatherHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return WeatherHandler
+
+
+def start_weather_stub(port=0, latency_ms=0):
+    """Serve the stub in a background thread. Returns (server, forecast_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency_ms))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1/forecast"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", args.port), make_handler(args.latency_ms)
+    )
+    print(f"Weather stub on http://127.0.0.1:{args.port}/v1/forecast")
+    server.serve_forever()
@@ -0,0 +1,76 @@
+import importlib.util
+import os
+import sys
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# verify_origin only lets localhost referers through in development
+os.environ["FLASK_ENV"] = "development"
+# Nothing listens here, weather lookups fail fast and fall back to defaults
+os.environ["WEATHER_API_URL"] = "http://127.0.0.1:9/v1/forecast"
+
+HEADERS = {"User-Agent": "Mozilla/5.0", "Referer": "http://localhost:3000/"}
+
+
+class TestConfig:
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = "test"
+    JWT_SECRET_KEY = "test-jwt-secret-test-jwt-secret-test"
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    RUNNING = "Test Config is running"
+    TESTING = True
+
+
+def make_app(tmp_path, **overrides):
+    from core import create_app
+
+    config = type(
+        "Config",
+        (TestConfig,),
+        dict(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'test.db'}", **overrides),
+    )
+    return create_app(config)
+
+
+def load_gunicorn_conf():
+    """gunicorn.conf.py as a module, to call its hooks."""
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    spec = importlib.util.spec_from_file_location(
+        "gunicorn_conf", os.path.join(root, "gunicorn.conf.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    # It exports GUNICORN_* for config.py, keep them out of other tests
+    with mock.patch.dict(os.environ):
+        spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def app(tmp_path):
+    from core.extensions import db
+
+    app = make_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def auth_headers(app):
+    from flask_jwt_extended import create_access_token
+
+    from core.extensions import db
+    from core.models import User
+
+    with app.app_context():
+        user = User(
+            email="test@example.com", password_hash="x", name="Test", is_admin=True
+        )
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=str(user.id))
+    return dict(HEADERS, Authorization=f"Bearer {token}")
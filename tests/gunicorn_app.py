@@ -0,0 +1,12 @@
+"""application.py plus a slow endpoint, for tests that serve it under gunicorn."""
+
+import os
+import time
+
+from application import application
+
+
+@application.route("/slow", methods=["GET", "POST"])
+def slow():
+    time.sleep(float(os.getenv("SLOW_SECONDS", 1.5)))
+    return "", 204
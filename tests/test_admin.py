@@ -0,0 +1,47 @@
+import pytest
+
+
+@pytest.fixture
+def events(app, auth_headers):
+    from core.extensions import db
+    from core.models import AnalyticsEvent
+
+    with app.app_context():
+        db.session.add_all(
+            AnalyticsEvent(user_id=1, event="click", meta={"i": i}) for i in range(3)
+        )
+        db.session.commit()
+
+
+@pytest.mark.parametrize("limit", ["0", "-1"])
+def test_analytics_limit_is_at_least_one(app, auth_headers, events, limit):
+    response = app.test_client().get(
+        f"/api/admin/analytics?limit={limit}", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert len(response.get_json()) == 1
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_users_limit_is_at_least_one(app, auth_headers):
+    response = app.test_client().get("/api/admin/users?limit=0", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.get_json()) == 1
+
+
+def test_csv_export_escapes_formulas(app, auth_headers):
+    from core.extensions import db
+    from core.models import Leads
+
+    with app.app_context():
+        db.session.add(Leads(email="lead@example.com", name='=HYPERLINK("x")'))
+        db.session.commit()
+
+    response = app.test_client().get(
+        "/api/admin/leads/export.csv", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert "'=HYPERLINK" in response.get_data(as_text=True)
@@ -0,0 +1,250 @@
+import importlib
+import threading
+import time
+
+import pytest
+
+from core.admission import CRITICAL, HIGH, NORMAL, AdmissionController, request_priority
+
+from .conftest import HEADERS, make_app
+
+
+def _controller_from(config):
+    return AdmissionController(
+        max_concurrent=config.ADMISSION_MAX_CONCURRENT,
+        max_queue=config.ADMISSION_MAX_QUEUE,
+        queue_timeout=config.ADMISSION_QUEUE_TIMEOUT,
+        reserved_high=config.ADMISSION_RESERVED_HIGH,
+    )
+
+
+@pytest.fixture
+def gthread_config(monkeypatch):
+    """config.Config as the shipped gunicorn.conf.py sets it up (4 threads)."""
+    sizing = {
+        "GUNICORN_WORKERS": "3",
+        "GUNICORN_THREADS": "4",
+        "GUNICORN_WORKER_CLASS": "gthread",
+    }
+    monkeypatch.setenv("PROD_DB_URI", "sqlite://")
+    for name, value in sizing.items():
+        monkeypatch.setenv(name, value)
+    import config
+
+    yield importlib.reload(config).Config
+
+    for name in sizing:
+        monkeypatch.delenv(name)
+    importlib.reload(config)
+
+
+def _acquire_in_thread(controller, priority):
+    result = {}
+    thread = threading.Thread(
+        target=lambda: result.update(r=controller.acquire(priority))
+    )
+    thread.start()
+    return thread, result
+
+
+def _wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_default_config_queues_and_keeps_a_slot_for_writes(gthread_config):
+    assert gthread_config.ADMISSION_ENABLED
+    assert gthread_config.ADMISSION_MAX_QUEUE >= 1
+    assert gthread_config.ADMISSION_RESERVED_HIGH >= 1
+    # A thread is left for health checks and metrics scrapes
+    assert (
+        gthread_config.ADMISSION_MAX_CONCURRENT + gthread_config.ADMISSION_MAX_QUEUE < 4
+    )
+
+    controller = _controller_from(gthread_config)
+    normal_slots = controller.max_concurrent - controller.reserved_high
+    for _ in range(normal_slots):
+        assert controller.acquire(NORMAL)[0]
+
+    # Normal traffic past its share waits instead of being shed
+    waiting, waiting_result = _acquire_in_thread(controller, NORMAL)
+    _wait_for(lambda: controller.stats()["queued"] == 1)
+
+    # An authenticated write still gets the reserved slot right away
+    assert controller.acquire(HIGH) == (True, None, 0.0)
+
+    # The queued request gets the first slot inside the normal share
+    controller.release(HIGH)
+    controller.release(NORMAL)
+    waiting.join()
+    assert waiting_result["r"][0]
+
+
+def test_write_displaces_queued_normal_request(gthread_config):
+    controller = _controller_from(gthread_config)
+    for _ in range(controller.max_concurrent):
+        assert controller.acquire(HIGH)[0]
+
+    normal, normal_result = _acquire_in_thread(controller, NORMAL)
+    _wait_for(lambda: controller.stats()["queued"] == 1)
+    write, write_result = _acquire_in_thread(controller, HIGH)
+
+    normal.join()
+    assert normal_result["r"][:2] == (False, "displaced")
+
+    controller.release(HIGH)
+    write.join()
+    assert write_result["r"][0]
+
+
+def test_queue_full_and_timeout_are_shed():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    assert controller.acquire(NORMAL)[0]
+
+    waiting, waiting_result = _acquire_in_thread(controller, NORMAL)
+    _wait_for(lambda: controller.stats()["queued"] == 1)
+    assert controller.acquire(NORMAL)[:2] == (False, "queue_full")
+
+    waiting.join()
+    assert waiting_result["r"][:2] == (False, "timeout")
+    assert controller.stats()["shed"] == {"normal:queue_full": 1, "normal:timeout": 1}
+
+
+def test_critical_requests_bypass_the_limit_without_using_slots():
+    controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.05)
+    for _ in range(5):
+        assert controller.acquire(CRITICAL)[0]
+    assert controller.stats()["active"] == 0
+
+    assert controller.acquire(NORMAL)[0]
+    controller.release(NORMAL)
+    for _ in range(5):
+        controller.release(CRITICAL)
+    assert controller.stats()["critical"] == 0
+
+
+def test_shed_response_is_a_503_recorded_in_metrics(tmp_path):
+    from core.extensions import metrics
+
+    app = make_app(
+        tmp_path,
+        ADMISSION_ENABLED=True,
+        ADMISSION_MAX_CONCURRENT=1,
+        ADMISSION_MAX_QUEUE=0,
+        ADMISSION_RESERVED_HIGH=0,
+        ADMISSION_RETRY_AFTER=3,
+        METRICS_ENABLED=True,
+    )
+    controller = app.extensions["admission"]
+    client = app.test_client()
+
+    controller.acquire(NORMAL)  # the worker is busy
+    response = client.get("/api/records/", headers=HEADERS)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+
+    # Health checks still get through
+    assert client.get("/health", headers=HEADERS).status_code == 200
+    controller.release(NORMAL)
+
+    rendered = metrics.render()
+    assert 'http_requests_shed_total{priority="normal",reason="queue_full"}' in rendered
+    assert 'status="503"' in rendered
+
+
+def test_unauthenticated_preflights_are_normal_priority(app):
+    with app.test_request_context("/api/records/", method="OPTIONS"):
+        assert request_priority() == NORMAL
+
+
+def test_health_is_served_while_gunicorn_worker_is_saturated(app):
+    """End to end: one gthread worker with the default admission settings."""
+    pytest.importorskip("gunicorn")
+    import os
+    import socket
+    import subprocess
+    import sys
+
+    import requests
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity="1")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    env = dict(
+        os.environ,
+        PROD_DB_URI=app.config["SQLALCHEMY_DATABASE_URI"],
+        JWT_SECRET_KEY=app.config["JWT_SECRET_KEY"],
+        GUNICORN_WORKERS="1",
+        GUNICORN_THREADS="4",
+        GUNICORN_WORKER_CLASS="gthread",
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_GRACEFUL_TIMEOUT="1",
+        WARMUP_ENABLED="0",
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "tests.gunicorn_app:application",
+        ],
+        cwd=root,
+        env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        _wait_for(lambda: _responds(base + "/health"), timeout=30)
+
+        # Slow reads and authenticated writes, enough of each to fill the
+        # normal slots, the queue and the slot kept for writes
+        stop = time.monotonic() + 4
+        write_headers = dict(HEADERS, Authorization=f"Bearer {token}")
+
+        def load(method, headers):
+            with requests.Session() as session:
+                while time.monotonic() < stop:
+                    session.request(method, base + "/slow", headers=headers, timeout=10)
+
+        clients = [
+            threading.Thread(target=load, args=("GET", HEADERS)) for _ in range(4)
+        ] + [
+            threading.Thread(target=load, args=("POST", write_headers))
+            for _ in range(4)
+        ]
+        for client in clients:
+            client.start()
+        time.sleep(0.5)
+
+        latencies = []
+        for _ in range(5):
+            started = time.monotonic()
+            response = requests.get(base + "/health", headers=HEADERS, timeout=10)
+            latencies.append(time.monotonic() - started)
+            assert response.status_code == 200
+            time.sleep(0.3)
+        for client in clients:
+            client.join()
+
+        # A health check waiting for a thread would take up to 1.5s
+        assert max(latencies) < 0.75, latencies
+    finally:
+        server.terminate()
+        server.wait(15)
+
+
+def _responds(url):
+    import requests
+
+    try:
+        return requests.get(url, headers=HEADERS, timeout=1).status_code == 200
+    except requests.RequestException:
+        return False
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"event": {"x": 1}},
+        {"event": "x" * 101},
+        {"event": "click", "meta": ["not", "a", "dict"]},
+        ["not", "an", "object"],
+    ],
+)
+def test_invalid_events_are_rejected(app, auth_headers, body):
+    response = app.test_client().post(
+        "/api/analytics/", json=body, headers=auth_headers
+    )
+
+    assert response.status_code == 400
+    assert app.extensions["analytics_buffer"].depth == 0
+
+
+def test_a_bad_row_does_not_block_later_flushes(app, auth_headers, monkeypatch):
+    from core.models import AnalyticsEvent
+
+    buffer = app.extensions["analytics_buffer"]
+    monkeypatch.setattr(buffer, "enabled", True)
+    monkeypatch.setattr(buffer, "_ensure_thread", lambda: None)  # flush by hand
+    monkeypatch.setattr(buffer, "dropped_events", 0)
+    now = datetime.utcnow()
+    buffer.add({"user_id": 1, "event": {"x": 1}, "meta": {}, "timestamp": now})
+    buffer.add({"user_id": 1, "event": "click", "meta": {}, "timestamp": now})
+
+    assert buffer.flush() == 1
+    assert buffer.depth == 0
+    assert buffer.dropped_events == 1
+
+    buffer.add({"user_id": 1, "event": "page_view", "meta": {}, "timestamp": now})
+    assert buffer.flush() == 1
+    with app.app_context():
+        assert sorted(e.event for e in AnalyticsEvent.query) == ["click", "page_view"]
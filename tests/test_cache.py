@@ -0,0 +1,33 @@
+import sqlite3
+
+from core.cache import MISSING, Cache, MemoryBackend
+
+
+class BrokenBackend(MemoryBackend):
+    def _fail(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+    get = set = add = delete = clear = _fail
+
+
+def test_backend_errors_are_logged_not_raised(caplog):
+    cache = Cache()
+    cache.backend = BrokenBackend()
+
+    assert cache.get("ns", "k") is None
+    cache.set("ns", "k", 1)
+    assert cache.delete("ns", "k") is False
+    assert cache.invalidate("ns") == 0
+    assert cache.get_or_set("ns", "k", lambda: 2) == 2
+    assert "Cache delete failed" in caplog.text
+    assert "Cache invalidate failed" in caplog.text
+
+
+def test_memory_add_evicts_past_max_entries():
+    backend = MemoryBackend(max_entries=2)
+    for key in "abc":
+        assert backend.add("ns", key, key, ttl=60)
+
+    assert len(backend._data) == 2
+    assert backend.get("ns", "a") is MISSING
+    assert backend.get("ns", "c") == "c"
@@ -0,0 +1,43 @@
+from .conftest import make_app
+
+
+def _lead_count(app):
+    from core.extensions import db
+    from core.models import Leads
+
+    with app.app_context():
+        return db.session.query(Leads).count()
+
+
+def test_full_filter_is_rebuilt_larger(tmp_path):
+    from core.extensions import db
+    from core.leads import capture_lead
+
+    app = make_app(tmp_path, LEADS_BLOOM_CAPACITY=4)
+    with app.app_context():
+        db.create_all()
+        for i in range(10):
+            assert capture_lead(f"lead{i}@example.com", "Lead")
+        assert not capture_lead("lead0@example.com", "Lead")
+
+        seen = app.extensions["leads_bloom"]
+        assert seen.capacity >= 16
+        assert seen.count < seen.capacity
+    assert _lead_count(app) == 10
+
+
+def test_filter_is_per_app(tmp_path):
+    from core.extensions import db
+    from core.leads import capture_lead
+
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = make_app(tmp_path / "a")
+    second = make_app(tmp_path / "b")
+    for app in (first, second):
+        with app.app_context():
+            db.create_all()
+            assert capture_lead("lead@example.com", "Lead")
+
+    assert first.extensions["leads_bloom"] is not second.extensions["leads_bloom"]
+    assert _lead_count(second) == 1
@@ -0,0 +1,46 @@
+import json
+import os
+import types
+
+from core.metrics import MetricsRegistry
+
+from .conftest import load_gunicorn_conf
+
+
+def _registry(directory):
+    registry = MetricsRegistry()
+    registry.enabled = True
+    registry.directory = str(directory)
+    return registry
+
+
+def _total(text):
+    line = next(l for l in text.splitlines() if l.startswith("http_requests_total{"))
+    return float(line.rsplit(" ", 1)[1])
+
+
+def test_exited_workers_counts_stay_in_the_totals(tmp_path, monkeypatch):
+    monkeypatch.setenv("METRICS_MULTIPROC_DIR", str(tmp_path))
+    conf = load_gunicorn_conf()
+    serving = _registry(tmp_path)
+    serving.inc("http_requests_total", 2, endpoint="x")
+
+    # A worker that has since exited (another pid)
+    exited = _registry(tmp_path)
+    exited.inc("http_requests_total", 5, endpoint="x")
+    exited.observe("http_request_duration_seconds", 0.2, endpoint="x")
+    with open(tmp_path / "metrics-4242.json", "w") as f:
+        json.dump(exited.snapshot(), f)
+
+    assert _total(serving.render()) == 7
+    conf.child_exit(None, types.SimpleNamespace(pid=4242))
+
+    for _ in range(2):
+        text = serving.render()
+        assert _total(text) == 7
+        assert 'http_request_duration_seconds_count{endpoint="x"} 1' in text
+    assert not (tmp_path / "dead-4242.json").exists()
+    assert (tmp_path / "aggregate.json").exists()
+
+    conf.on_starting(None)
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".json")]
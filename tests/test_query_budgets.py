@@ -0,0 +1,113 @@
+import pytest
+
+from core.query_budget import assert_query_budget, missing_budgets
+
+from .conftest import HEADERS
+
+# Both talk to Google, their budgets are still checked by missing_budgets
+NEEDS_NETWORK = {"auth.login_google", "auth.google_callback"}
+
+# (method, url, json body); {record}, {event} and {user} are filled in from the seed
+REQUESTS = [
+    ("GET", "/api/auth/", None),
+    (
+        "POST",
+        "/api/auth/register",
+        {"email": "new@example.com", "password": "pw", "name": "New"},
+    ),
+    ("POST", "/api/auth/login", {"email": "user1@example.com", "password": "password"}),
+    ("GET", "/api/records/", None),
+    ("GET", "/api/records/all", None),
+    ("POST", "/api/records/", {"hrv": 60, "rhr": 55, "sleep_duration": 7.5}),
+    ("GET", "/api/records/today", None),
+    ("PUT", "/api/records/{record}/", {"hrv": 61}),
+    ("PUT", "/api/records/records/{record}", {"ended_at": "2026-01-01T22:00:00"}),
+    ("GET", "/api/cycles/", None),
+    ("GET", "/api/cycles/today", None),
+    (
+        "POST",
+        "/api/cycles/",
+        {"event_type": "peak", "start_time": "09:00:00", "end_time": "10:30:00"},
+    ),
+    ("PUT", "/api/cycles/{event}", {"event_type": "trough"}),
+    ("GET", "/api/users/me", None),
+    ("GET", "/api/users/{user}", None),
+    ("PUT", "/api/users/me", {"name": "Renamed"}),
+    ("DELETE", "/api/users/me", None),
+    ("PUT", "/api/users/{user}", {"name": "Renamed"}),
+    ("GET", "/api/ultradian/", None),
+    ("POST", "/api/ultradian/", {}),
+    ("GET", "/api/energy-potential/", None),
+    ("GET", "/api/vibe-score/", None),
+    ("POST", "/api/analytics/", {"event": "page_view", "meta": {"page": "/"}}),
+    (
+        "POST",
+        "/api/analytics/batch",
+        [{"event": "click", "meta": {"i": i}} for i in range(5)],
+    ),
+    ("GET", "/api/admin/", None),
+    ("GET", "/api/admin/analytics", None),
+    ("GET", "/api/admin/analytics/counts", None),
+    ("GET", "/api/admin/analytics/timeseries", None),
+    ("GET", "/api/admin/slow-queries", None),
+    ("GET", "/api/admin/analytics/buffer", None),
+    ("GET", "/api/admin/cache", None),
+    ("DELETE", "/api/admin/cache/baselines", None),
+    ("GET", "/api/admin/users", None),
+    ("GET", "/api/admin/users/export.csv", None),
+    ("GET", "/api/admin/leads", None),
+    ("GET", "/api/admin/leads/export.csv", None),
+]
+
+
+@pytest.fixture
+def seeded(app):
+    """App with generated data, and headers for user 1 (an admin)."""
+    from flask_jwt_extended import create_access_token
+
+    from core.extensions import db
+    from core.models import User, UserCycleEvent, UserDailyRecord
+    from core.seed import generate
+
+    with app.app_context():
+        generate(3, 14, leads=5, seed=1)
+        user = db.session.get(User, 1)
+        user.is_admin = True
+        db.session.commit()
+        record = UserDailyRecord.query.filter_by(user_id=1).first()
+        event = UserCycleEvent.query.filter_by(user_daily_record_id=record.id).first()
+        ids = {"record": record.id, "event": event.id if event else 0, "user": 2}
+        headers = dict(
+            HEADERS, Authorization=f"Bearer {create_access_token(identity='1')}"
+        )
+    return app, headers, ids
+
+
+def test_every_route_declares_a_budget(app):
+    assert missing_budgets(app) == []
+
+
+def test_requests_cover_every_route(app):
+    covered = set()
+    with app.app_context():
+        adapter = app.url_map.bind("localhost")
+        for method, url, _ in REQUESTS:
+            url = url.format(record=1, event=1, user=1)
+            covered.add(adapter.match(url, method=method)[0])
+    routes = {
+        e
+        for e, v in app.view_functions.items()
+        if v.__module__.startswith("core.routes")
+    }
+    assert routes - covered == NEEDS_NETWORK
+
+
+@pytest.mark.parametrize(
+    "method,url,body", REQUESTS, ids=[f"{m} {u}" for m, u, _ in REQUESTS]
+)
+def test_route_stays_within_query_budget(seeded, method, url, body):
+    app, headers, ids = seeded
+    response = assert_query_budget(
+        app.test_client(), method, url.format(**ids), headers=headers, json=body
+    )
+    assert response.status_code < 500
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+
+def test_baselines_are_cleared_after_the_commit(app, auth_headers, monkeypatch):
+    from core.extensions import db
+    from core.models import User, UserDailyRecord
+
+    with app.app_context():
+        record = UserDailyRecord(
+            user_id=1, date=date.today() - timedelta(days=1), hrv=50
+        )
+        db.session.add(record)
+        db.session.commit()
+        record_id = record.id
+
+    seen = []
+    clear = User.clear_baselines_for
+
+    def check_committed(user_id, days=7):
+        # A fresh connection, like a concurrent request's, must see the new row
+        with db.engine.connect() as conn:
+            seen.append(
+                conn.execute(
+                    text("SELECT hrv FROM user_daily_record WHERE id = :id"),
+                    {"id": record_id},
+                ).scalar()
+            )
+        clear(user_id, days)
+
+    monkeypatch.setattr(User, "clear_baselines_for", check_committed)
+    client = app.test_client()
+
+    response = client.put(
+        f"/api/records/{record_id}/", json={"hrv": 70}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    response = client.post("/api/records/", json={"hrv": 80}, headers=auth_headers)
+    assert response.status_code == 200
+
+    assert seen == [70, 70]
+
+
+def test_schedule_follows_wake_time_changes(app, auth_headers):
+    client = app.test_client()
+
+    def first_peak():
+        response = client.get("/api/ultradian/?grog=0", headers=auth_headers)
+        return response.get_json()["cycles"][0]["peak_start"] if response.data else None
+
+    assert first_peak() is None
+    client.post("/api/records/", json={"wake_time": "07:00"}, headers=auth_headers)
+    assert first_peak() == "07:00:00"
+    # Served from the cache until the record changes
+    assert first_peak() == "07:00:00"
+
+    response = client.get("/api/records/today", headers=auth_headers)
+    record_id = response.get_json()["id"]
+    client.put(
+        f"/api/records/{record_id}/", json={"wake_time": "06:30"}, headers=auth_headers
+    )
+    assert first_peak() == "06:30:00"
@@ -0,0 +1,99 @@
+import pytest
+from flask import g
+
+from .conftest import HEADERS, make_app
+
+
+def _make_replica_app(tmp_path, replica_uri):
+    from core.extensions import db
+    from core.models import User
+
+    app = make_app(
+        tmp_path,
+        SQLALCHEMY_REPLICA_URIS=[replica_uri],
+        CACHE_BACKEND="sqlite",
+        CACHE_SQLITE_PATH=str(tmp_path / "cache.sqlite"),
+    )
+    with app.app_context():
+        db.create_all(bind_key=None)
+        for i in (1, 2):
+            db.session.add(
+                User(email=f"user{i}@example.com", password_hash="x", name="U")
+            )
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    from core.extensions import db
+
+    # The "replica" is the primary's own file, so both see the same rows
+    yield _make_replica_app(tmp_path, f"sqlite:///{tmp_path / 'test.db'}")
+    # init_app registered metadata for the replica bind on the shared db,
+    # other tests' create_all would look for the bind
+    for key in [k for k in db.metadatas if k]:
+        del db.metadatas[key]
+
+
+@pytest.fixture
+def dead_replica_app(tmp_path):
+    from core.extensions import db
+
+    # The directory doesn't exist, so every connection attempt fails
+    yield _make_replica_app(
+        tmp_path, f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    )
+    for key in [k for k in db.metadatas if k]:
+        del db.metadatas[key]
+
+
+def _token(app, user_id):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        return create_access_token(identity=str(user_id))
+
+
+def _reads_from_replica(client, headers):
+    with client:
+        client.get("/api/records/", headers=headers)
+        return g.get("_db_replica") is not None
+
+
+def test_reads_follow_the_writer_not_the_cookie(replica_app):
+    writer = dict(HEADERS, Authorization=f"Bearer {_token(replica_app, 1)}")
+    other = dict(HEADERS, Authorization=f"Bearer {_token(replica_app, 2)}")
+
+    assert _reads_from_replica(replica_app.test_client(), writer)
+
+    response = replica_app.test_client().post(
+        "/api/analytics/", json={"event": "x"}, headers=writer
+    )
+    assert response.status_code < 400
+    # The identity is tracked server-side, so no cookie is needed
+    assert "db_primary" not in response.headers.get("Set-Cookie", "")
+
+    # A fresh client (another device) with the same token reads from the primary
+    assert not _reads_from_replica(replica_app.test_client(), writer)
+    assert _reads_from_replica(replica_app.test_client(), other)
+
+
+def test_anonymous_writes_fall_back_to_the_cookie(replica_app):
+    client = replica_app.test_client()
+    client.post("/leads", json={"email": "lead@example.com"}, headers=HEADERS)
+
+    assert not _reads_from_replica(client, HEADERS)
+
+
+def test_reads_that_hit_a_dead_replica_are_retried_on_the_primary(dead_replica_app):
+    headers = dict(HEADERS, Authorization=f"Bearer {_token(dead_replica_app, 1)}")
+    client = dead_replica_app.test_client()
+
+    response = client.get("/api/users/me", headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()["email"] == "user1@example.com"
+    # Marked down, so the next request goes straight to the primary
+    assert not _reads_from_replica(client, headers)
+    assert client.get("/api/users/me", headers=headers).status_code == 200
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from core.rollups import event_counts, event_timeseries, rollup_analytics
+
+
+def _seed(app):
+    from core.extensions import db
+    from core.models import AnalyticsEvent, User
+
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        days=1
+    )
+    with app.app_context():
+        for i in (1, 2):
+            db.session.add(
+                User(email=f"user{i}@example.com", password_hash="x", name="U")
+            )
+        db.session.flush()
+        db.session.add_all(
+            AnalyticsEvent(
+                user_id=1 + i % 2,
+                event="page_view",
+                timestamp=start + timedelta(minutes=i),
+            )
+            for i in range(5)
+        )
+        db.session.add(AnalyticsEvent(user_id=2, event="click", timestamp=start))
+        db.session.commit()
+        assert rollup_analytics() == 6
+
+
+def test_dashboards_read_the_global_totals(app):
+    from core.models import AnalyticsDailyTotal, AnalyticsHourlyTotal
+
+    _seed(app)
+    with app.app_context():
+        assert AnalyticsHourlyTotal.query.count() == 2
+        assert AnalyticsDailyTotal.query.count() == 2
+        assert event_counts("hour") == {"page_view": 5, "click": 1}
+        assert [p["count"] for p in event_timeseries("day")] == [6]
+
+
+def test_user_filter_reads_the_per_user_rollup(app):
+    _seed(app)
+    with app.app_context():
+        assert event_counts("day", user_id=1) == {"page_view": 3}
+        assert event_counts("day", user_id=2) == {"page_view": 2, "click": 1}
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+
+def test_generated_timestamps_are_not_in_the_future(app):
+    from sqlalchemy import func, select
+
+    from core.extensions import db
+    from core.models import AnalyticsEvent, Leads
+    from core.seed import generate
+
+    with app.app_context():
+        # Days end 16h after waking, so today's events would run into the future
+        generate(5, 2, leads=20, seed=3)
+        latest_event = db.session.scalar(select(func.max(AnalyticsEvent.timestamp)))
+        latest_lead = db.session.scalar(select(func.max(Leads.timestamp)))
+
+    assert latest_event <= datetime.utcnow()
+    assert latest_lead <= datetime.now()
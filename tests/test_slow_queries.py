@@ -0,0 +1,82 @@
+import json
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from core import slow_queries
+
+from .conftest import make_app
+
+
+@pytest.fixture
+def slow_app(tmp_path):
+    from core.extensions import db
+
+    app = make_app(tmp_path, SLOW_QUERY_MS=0, SLOW_QUERY_SAMPLE_RATE=0.0)
+    with app.app_context():
+        db.create_all()
+    slow_queries.reset_slow_queries()
+    yield app
+    slow_queries._settings.update(
+        threshold_ms=None, sample_rate=1.0, explain=True, log_params=False
+    )
+    slow_queries.reset_slow_queries()
+
+
+def _run(app, n=5):
+    from core.extensions import db
+
+    with app.app_context():
+        for i in range(n):
+            db.session.execute(
+                text("SELECT :secret AS value"), {"secret": f"hunter{i}"}
+            )
+
+
+def test_every_slow_query_is_counted_whatever_the_sample_rate(slow_app, caplog):
+    with caplog.at_level(logging.WARNING, logger="core.slow_queries"):
+        _run(slow_app)
+
+    [entry] = [
+        e for e in slow_queries.top_slow_queries() if "AS value" in e["statement"]
+    ]
+    assert entry["count"] == 5
+    assert not caplog.records
+
+
+def test_logged_parameters_are_redacted(slow_app, caplog):
+    slow_queries._settings["sample_rate"] = 1.0
+    with caplog.at_level(logging.WARNING, logger="core.slow_queries"):
+        _run(slow_app, n=1)
+
+    logged = [json.loads(r.getMessage()) for r in caplog.records]
+    assert logged
+    assert "hunter" not in caplog.text
+    assert logged[-1]["parameters"] == ["str"]
+    assert logged[-1]["plan"]
+
+
+def test_parameters_are_logged_when_enabled(tmp_path, caplog):
+    app = make_app(tmp_path, SLOW_QUERY_MS=0, SLOW_QUERY_LOG_PARAMS=True)
+    try:
+        with caplog.at_level(logging.WARNING, logger="core.slow_queries"):
+            _run(app, n=1)
+    finally:
+        slow_queries._settings.update(
+            threshold_ms=None, sample_rate=1.0, explain=True, log_params=False
+        )
+        slow_queries.reset_slow_queries()
+
+    logged = [json.loads(r.getMessage()) for r in caplog.records]
+    assert logged[-1]["parameters"] == ["hunter0"]
+
+
+def test_failed_explain_leaves_the_transaction_usable(slow_app):
+    from core.extensions import db
+
+    with slow_app.app_context():
+        connection = db.session.connection()
+        plan = slow_queries._explain(connection, "SELECT * FROM no_such_table", ())
+        assert plan == ["EXPLAIN failed: OperationalError"]
+        assert db.session.execute(text("SELECT 1")).scalar() == 1
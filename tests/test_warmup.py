@@ -0,0 +1,58 @@
+import logging
+import os
+import time
+import types
+
+from core import warmup
+
+from .conftest import load_gunicorn_conf, make_app
+
+
+def test_steps_past_the_budget_are_skipped(app):
+    timings = warmup.warm_up(app, budget=0)
+
+    assert set(timings) == {
+        "connections",
+        "weather_dns",
+        "http_session",
+        "caches",
+        "total",
+    }
+    assert all(timings[step] is None for step in timings if step != "total")
+
+
+def test_worker_starts_when_warm_up_hangs(tmp_path, monkeypatch):
+    from core.extensions import db
+
+    app = make_app(tmp_path, WARMUP_TIMEOUT=0.2)
+    with app.app_context():
+        db.create_all()
+    monkeypatch.setattr(warmup, "_open_connections", lambda app: time.sleep(2))
+    worker = types.SimpleNamespace(
+        pid=os.getpid(),
+        wsgi=app,
+        cfg=types.SimpleNamespace(worker_class_str="gthread", timeout=60),
+        log=logging.getLogger("test.worker"),
+    )
+
+    started = time.monotonic()
+    load_gunicorn_conf().post_worker_init(worker)
+
+    assert time.monotonic() - started < 1
+
+
+def test_caches_are_primed_for_recent_users(app, auth_headers):
+    from datetime import date, time as clock
+
+    from core.extensions import cache, db
+    from core.models import UserDailyRecord
+
+    with app.app_context():
+        db.session.add(
+            UserDailyRecord(user_id=1, date=date.today(), wake_time=clock(7))
+        )
+        db.session.commit()
+
+    warmup.warm_up(app)
+
+    assert cache.get("wake_times", f"1:{date.today()}") == "07:00:00"
@@ -1,16 +1,35 @@
 # utils/weather.py
-import requests
+import os
+
+from flask import current_app, has_app_context
+
+from core.extensions import cache
+from core.outbound import http_session
+from core.profiling import track_http
+
+# Overridable so benchmarks and local runs can point at a stub server
+WEATHER_API_URL = os.getenv("WEATHER_API_URL", "https://api.open-meteo.com/v1/forecast")
 
 
 def get_weather_data(lat: float, lon: float):
+    # Two decimals is about 1km, close enough to share one reading
+    lat, lon = round(lat, 2), round(lon, 2)
+    ttl = current_app.config.get("WEATHER_CACHE_TTL", 600) if has_app_context() else 600
+    return cache.get_or_set(
+        "weather", f"{lat},{lon}", lambda: fetch_weather_data(lat, lon), ttl=ttl
+    )
+
+
+def fetch_weather_data(lat: float, lon: float):
     url = (
-        f"https://api.open-meteo.com/v1/forecast"
+        f"{WEATHER_API_URL}"
         f"?latitude={lat}&longitude={lon}"
         f"&current=temperature_2m,dew_point_2m,relative_humidity_2m,pressure_msl"
     )
 
     try:
-        response = requests.get(url, timeout=5)
+        with track_http():
+            response = http_session().get(url, timeout=5)
         response.raise_for_status()
         data = response.json()
 